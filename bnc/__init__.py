@@ -1,19 +1,23 @@
 from .board import Board
+from .code import Code
 from .game import Game
 from .player import Player
 from .state import GameConfig, GameMode, GameState
 from .utils import (
     generate_guess,
+    generate_secrets,
     get_random_number,
 )
 
 __all__ = [
     "Board",
+    "Code",
     "Game",
     "GameConfig",
     "GameMode",
     "GameState",
     "Player",
     "generate_guess",
+    "generate_secrets",
     "get_random_number",
 ]
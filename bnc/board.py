@@ -1,11 +1,15 @@
+from collections.abc import Iterator
 from dataclasses import dataclass
 
-from .utils import calculate_bulls_and_cows, validate_code_input
+from .candidates import CandidateSet
+from .code import Code
+from .utils import calculate_bulls_and_cows
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BoardRow:
-    guess: list[int]
+    # immutable so every unfilled row on every board can be the same object
+    guess: Code | None = None
     bulls: int = 0
     cows: int = 0
     is_filled: bool = False
@@ -15,6 +19,9 @@ class BoardRow:
         return self.is_filled and self.bulls == len(self.guess)
 
 
+_EMPTY_ROW = BoardRow()
+
+
 class Board:
     def __init__(
         self,
@@ -34,18 +41,18 @@ class Board:
         self._code_length = code_length
         self._num_of_colors = num_of_colors
         self._num_of_guesses = num_of_guesses
-        self._secret_digits: list[int] = []
+        self._secret: Code | None = None
         self._board: list[BoardRow] = self._init_board()
+        # codes consistent with every filled row; built on first use and then
+        # narrowed as each new row is filled
+        self._candidates: CandidateSet | None = None
         self._game_won = False
         self._game_over = False
 
     def _init_board(self):
-        board = []
         if self._secret_code:
-            self._secret_digits = self.validate_secret_code(self._secret_code)
-        for _ in range(self._num_of_guesses):
-            board.append(BoardRow([0] * self._code_length))
-        return board
+            self._secret = self.validate_secret_code(self._secret_code)
+        return [_EMPTY_ROW] * self._num_of_guesses
 
     @property
     def board(self):
@@ -61,9 +68,13 @@ class Board:
 
     @secret_code.setter
     def secret_code(self, secret_code: str) -> None:
-        self._secret_digits = self.validate_secret_code(secret_code)
+        self._secret = self.validate_secret_code(secret_code)
         self._secret_code = secret_code
 
+    @property
+    def secret(self) -> Code | None:
+        return self._secret
+
     @property
     def num_of_colors(self):
         return self._num_of_colors
@@ -95,20 +106,46 @@ class Board:
             secret_code=self._secret_code,
         )
 
-    def set_board_row(
-        self, bulls: int, cows: int, guess_digits: list[int], board_row_index: int
-    ):
-        self._board[board_row_index] = BoardRow(
-            guess=guess_digits, bulls=bulls, cows=cows, is_filled=True
-        )
+    @property
+    def candidates(self) -> CandidateSet:
+        return self._get_candidates().copy()
+
+    @property
+    def candidate_count(self) -> int:
+        return len(self._get_candidates())
+
+    def iter_candidates(self) -> Iterator[Code]:
+        return iter(self._get_candidates())
+
+    def _get_candidates(self) -> CandidateSet:
+        if self._candidates is None:
+            self._candidates = CandidateSet.from_history(
+                (
+                    (row.guess, row.bulls, row.cows)
+                    for row in self._board
+                    if row.is_filled
+                ),
+                self._code_length,
+                self._num_of_colors,
+            )
+        return self._candidates
+
+    def set_board_row(self, bulls: int, cows: int, guess: Code, board_row_index: int):
+        replaced = self._board[board_row_index].is_filled
+        row = BoardRow(guess=guess, bulls=bulls, cows=cows, is_filled=True)
+        self._board[board_row_index] = row
+
+        if replaced:
+            self._candidates = None
+        elif self._candidates is not None:
+            self._candidates.apply(guess, bulls, cows)
 
     def display_board(self) -> None:
         print("-" * 40)
         for i, row in enumerate(self._board):
             if row.is_filled:
-                guess_str = "".join(map(str, row.guess))
                 print(
-                    f"Guess {i + 1}: {guess_str} | Bulls: {row.bulls} | Cows: {row.cows}"
+                    f"Guess {i + 1}: {row.guess} | Bulls: {row.bulls} | Cows: {row.cows}"
                 )
             else:
                 print(f"Guess {i + 1}: {'_' * self._code_length}")
@@ -116,27 +153,32 @@ class Board:
     def check_board_row_index(self, board_row_index: int) -> bool:
         return 0 <= board_row_index < self._num_of_guesses
 
-    def validate_secret_code(self, secret_code: str) -> list[int]:
+    def validate_secret_code(self, secret_code: str) -> Code:
         if secret_code is None:
             raise ValueError("secret code cannot be None")
-        secret_digits = validate_code_input(
-            secret_code, self._code_length, self._num_of_colors
-        )
-        return secret_digits
-
-    def evaluate_guess(self, board_row_index: int, guess: str) -> None:
-        if not self._secret_digits:
+        return Code.from_str(secret_code, self._code_length, self._num_of_colors)
+
+    def to_code(self, guess: str | Code) -> Code:
+        if isinstance(guess, Code):
+            if (
+                guess.code_length != self._code_length
+                or guess.num_of_colors != self._num_of_colors
+            ):
+                raise ValueError(f"Code {guess} does not match the board configuration")
+            return guess
+        return Code.from_str(guess, self._code_length, self._num_of_colors)
+
+    def evaluate_guess(self, board_row_index: int, guess: str | Code) -> None:
+        if self._secret is None:
             raise ValueError("Secret code must be set before evaluating guesses")
         if not self.check_board_row_index(board_row_index):
             raise ValueError("Row index is out of range")
 
-        guess_digits = validate_code_input(
-            guess, self._code_length, self._num_of_colors
-        )
+        guess_code = self.to_code(guess)
         bulls_count, cows_count = calculate_bulls_and_cows(
-            self._secret_digits, guess_digits
+            self._secret.digits, guess_code.digits
         )
-        self.set_board_row(bulls_count, cows_count, guess_digits, board_row_index)
+        self.set_board_row(bulls_count, cows_count, guess_code, board_row_index)
 
         if self._board[board_row_index].is_winning_row:
             self._game_won = True
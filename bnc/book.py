@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .code import Code
+from .feedback import default_cache_dir, encode_feedback
+from .solver import STRATEGIES, History, Solver
+
+logger = logging.getLogger(__name__)
+
+
+class OpeningBook:
+    # best next guess for every history the building solver can reach within
+    # its first `depth` moves. Each move is packed as
+    # guess_rank * num_of_feedbacks + feedback + 1 and a history is the
+    # base-(num_of_codes * num_of_feedbacks + 1) number made of its moves,
+    # so the empty history is key 0. On disk the book is a single (2, n + 1)
+    # uint64 .npy: column 0 holds (code_length, num_of_colors) and the rest
+    # holds the keys, sorted, above their guesses.
+    def __init__(self, code_length: int, num_of_colors: int, table: np.ndarray):
+        self.code_length = code_length
+        self.num_of_colors = num_of_colors
+        self.num_of_feedbacks = (code_length + 1) ** 2
+        self.base = num_of_colors**code_length * self.num_of_feedbacks + 1
+        self._table = table
+        self._keys = table[0, 1:]
+        self._guesses = table[1, 1:]
+
+    @classmethod
+    def build(cls, solver: Solver, depth: int = 2) -> OpeningBook:
+        code_length, num_of_colors = solver.code_length, solver.num_of_colors
+        base = num_of_colors**code_length * solver.num_of_feedbacks + 1
+        if depth < 1:
+            raise ValueError(f"depth must be at least 1, got {depth}")
+        if base ** (depth - 1) >= 2**64:
+            raise ValueError(f"Book keys overflow 64 bits at depth {depth}")
+
+        entries: dict[int, int] = {}
+        win = encode_feedback(code_length, 0, code_length)
+
+        def visit(key: int, history: list, candidates: np.ndarray, moves: int):
+            guess = solver.next_guess(history, candidates)
+            entries[key] = guess.rank
+            if moves + 1 >= depth:
+                return
+            feedback = solver.feedback(guess.rank, candidates)[0]
+            for value in np.unique(feedback).tolist():
+                if value == win:
+                    continue
+                bulls, cows = divmod(value, code_length + 1)
+                visit(
+                    key * base + guess.rank * solver.num_of_feedbacks + value + 1,
+                    [*history, (guess, bulls, cows)],
+                    candidates[feedback == value],
+                    moves + 1,
+                )
+
+        visit(0, [], solver.candidates([]), 0)
+        logger.info(
+            "Built opening book for %dx%d with %d positions",
+            code_length,
+            num_of_colors,
+            len(entries),
+        )
+
+        keys = sorted(entries)
+        table = np.empty((2, len(keys) + 1), dtype=np.uint64)
+        table[:, 0] = (code_length, num_of_colors)
+        table[0, 1:] = keys
+        table[1, 1:] = [entries[key] for key in keys]
+        return cls(code_length, num_of_colors, table)
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, self._table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> OpeningBook:
+        table = np.load(path, mmap_mode="r")
+        if table.ndim != 2 or table.shape[0] != 2 or table.dtype != np.uint64:
+            raise ValueError(f"{path} is not an opening book")
+        return cls(int(table[0, 0]), int(table[1, 0]), table)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def key(self, history: History) -> int | None:
+        key = 0
+        for guess, bulls, cows in history:
+            if not isinstance(guess, Code):
+                guess = Code.from_str(guess, self.code_length, self.num_of_colors)
+            feedback = encode_feedback(bulls, cows, self.code_length)
+            key = key * self.base + guess.rank * self.num_of_feedbacks + feedback + 1
+            if key >= 2**64:
+                return None
+        return key
+
+    def lookup(self, history: History) -> Code | None:
+        key = self.key(history)
+        if key is None:
+            return None
+        index = int(np.searchsorted(self._keys, np.uint64(key)))
+        if index == len(self._keys) or int(self._keys[index]) != key:
+            return None
+        return Code.unrank(
+            int(self._guesses[index]), self.code_length, self.num_of_colors
+        )
+
+
+def opening_book_path(
+    strategy: str,
+    code_length: int,
+    num_of_colors: int,
+    cache_dir: Path | str | None = None,
+) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    return cache_dir / f"book_{strategy}_{code_length}x{num_of_colors}.npy"
+
+
+def load_opening_book(
+    strategy: str,
+    code_length: int,
+    num_of_colors: int,
+    cache_dir: Path | str | None = None,
+) -> OpeningBook | None:
+    path = opening_book_path(strategy, code_length, num_of_colors, cache_dir)
+    if not path.exists():
+        return None
+    return OpeningBook.load(path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute a solver opening book")
+    parser.add_argument("--code-length", type=int, default=4)
+    parser.add_argument("--num-of-colors", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="knuth")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args(argv)
+
+    solver = STRATEGIES[args.strategy](args.code_length, args.num_of_colors)
+    book = OpeningBook.build(solver, depth=args.depth)
+    path = opening_book_path(
+        args.strategy, args.code_length, args.num_of_colors, args.cache_dir
+    )
+    book.save(path)
+    print(f"Wrote {len(book)} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from .code import Code
+from .feedback import encode_feedback, loaded_feedback_matrix, score_feedback
+
+# number of 64-bit words expanded into ranks at a time when filtering
+_WORDS_PER_CHUNK = 1 << 14
+_ALL_BITS = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+
+class CandidateSet:
+    # one bit per code rank, packed little-endian into uint64 words
+    def __init__(
+        self, code_length: int, num_of_colors: int, words: np.ndarray | None = None
+    ) -> None:
+        self.code_length = code_length
+        self.num_of_colors = num_of_colors
+        self.num_of_codes = num_of_colors**code_length
+        num_of_words = -(-self.num_of_codes // 64)
+        if words is None:
+            words = np.zeros(num_of_words, dtype=np.uint64)
+        elif words.shape != (num_of_words,) or words.dtype != np.uint64:
+            raise ValueError(
+                f"Expected {num_of_words} uint64 words, got {words.shape} {words.dtype}"
+            )
+        self._words = words
+
+    @classmethod
+    def full(cls, code_length: int, num_of_colors: int) -> CandidateSet:
+        candidates = cls(code_length, num_of_colors)
+        candidates._words[:] = _ALL_BITS
+        tail = candidates.num_of_codes % 64
+        if tail:
+            candidates._words[-1] = np.uint64((1 << tail) - 1)
+        return candidates
+
+    @classmethod
+    def from_ranks(
+        cls, ranks: Iterable[int], code_length: int, num_of_colors: int
+    ) -> CandidateSet:
+        candidates = cls(code_length, num_of_colors)
+        candidates._set_ranks(np.fromiter(ranks, dtype=np.int64))
+        return candidates
+
+    @classmethod
+    def from_history(
+        cls,
+        history: Iterable[tuple[Code | str, int, int]],
+        code_length: int,
+        num_of_colors: int,
+    ) -> CandidateSet:
+        candidates = cls.full(code_length, num_of_colors)
+        for guess, bulls, cows in history:
+            candidates.apply(guess, bulls, cows)
+        return candidates
+
+    @property
+    def words(self) -> np.ndarray:
+        return self._words
+
+    @property
+    def nbytes(self) -> int:
+        return self._words.nbytes
+
+    def copy(self) -> CandidateSet:
+        return CandidateSet(self.code_length, self.num_of_colors, self._words.copy())
+
+    def _set_ranks(self, ranks: np.ndarray) -> None:
+        bits = np.left_shift(np.uint64(1), (ranks & 63).astype(np.uint64))
+        np.bitwise_or.at(self._words, ranks >> 6, bits)
+
+    def _iter_rank_chunks(self) -> Iterator[np.ndarray]:
+        for start in range(0, len(self._words), _WORDS_PER_CHUNK):
+            words = self._words[start : start + _WORDS_PER_CHUNK]
+            occupied = np.flatnonzero(words)
+            if not len(occupied):
+                continue
+            bits = np.unpackbits(
+                words[occupied].view(np.uint8), bitorder="little"
+            ).reshape(-1, 64)
+            rows, columns = np.nonzero(bits)
+            yield (start + occupied[rows]).astype(np.int64) * 64 + columns
+
+    def ranks(self) -> np.ndarray:
+        chunks = list(self._iter_rank_chunks())
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def _to_rank(self, code: Code | str | int) -> int:
+        if isinstance(code, str):
+            code = Code.from_str(code, self.code_length, self.num_of_colors)
+        return int(code)
+
+    def apply(self, guess: Code | str | int, bulls: int, cows: int) -> None:
+        # keep only the candidates that would answer guess with (bulls, cows);
+        # only the surviving ranks are rescored, from the feedback matrix if
+        # it has been loaded and directly otherwise, so that filtering never
+        # builds the whole matrix
+        guess = self._to_rank(guess)
+        expected = encode_feedback(bulls, cows, self.code_length)
+        matrix = loaded_feedback_matrix(self.code_length, self.num_of_colors)
+        for ranks in self._iter_rank_chunks():
+            if matrix is not None:
+                feedback = matrix[guess, ranks]
+            else:
+                feedback = score_feedback(
+                    guess, ranks, self.code_length, self.num_of_colors
+                )[0]
+            rejected = ranks[feedback != expected]
+            bits = np.left_shift(np.uint64(1), (rejected & 63).astype(np.uint64))
+            np.bitwise_and.at(self._words, rejected >> 6, ~bits)
+
+    def filter(self, guess: Code | str | int, bulls: int, cows: int) -> CandidateSet:
+        candidates = self.copy()
+        candidates.apply(guess, bulls, cows)
+        return candidates
+
+    def _check_compatible(self, other: CandidateSet) -> None:
+        if (self.code_length, self.num_of_colors) != (
+            other.code_length,
+            other.num_of_colors,
+        ):
+            raise ValueError("Candidate sets belong to different code spaces")
+
+    def __and__(self, other: CandidateSet) -> CandidateSet:
+        self._check_compatible(other)
+        return CandidateSet(
+            self.code_length, self.num_of_colors, self._words & other._words
+        )
+
+    def __iand__(self, other: CandidateSet) -> CandidateSet:
+        self._check_compatible(other)
+        self._words &= other._words
+        return self
+
+    def __or__(self, other: CandidateSet) -> CandidateSet:
+        self._check_compatible(other)
+        return CandidateSet(
+            self.code_length, self.num_of_colors, self._words | other._words
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CandidateSet):
+            return NotImplemented
+        return (
+            self.code_length == other.code_length
+            and self.num_of_colors == other.num_of_colors
+            and np.array_equal(self._words, other._words)
+        )
+
+    __hash__ = None
+
+    def __len__(self) -> int:
+        return int(np.bitwise_count(self._words).sum())
+
+    def __contains__(self, code: Code | str | int) -> bool:
+        rank = self._to_rank(code)
+        if not 0 <= rank < self.num_of_codes:
+            return False
+        return bool((int(self._words[rank >> 6]) >> (rank & 63)) & 1)
+
+    def __iter__(self) -> Iterator[Code]:
+        for ranks in self._iter_rank_chunks():
+            for rank in ranks.tolist():
+                yield Code(rank, self.code_length, self.num_of_colors)
+
+    def __repr__(self) -> str:
+        return (
+            f"CandidateSet(code_length={self.code_length}, "
+            f"num_of_colors={self.num_of_colors}, size={len(self)})"
+        )
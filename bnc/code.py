@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .utils import check_color
+
+
+@dataclass(frozen=True, slots=True)
+class Code:
+    # digits packed into a single mixed-radix int: the first digit is the most
+    # significant and digit d contributes (d - 1), so rank runs from 0 to
+    # num_of_colors ** code_length - 1 in the same order as utils.code_space
+    rank: int
+    code_length: int
+    num_of_colors: int
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.rank < self.num_of_colors**self.code_length:
+            raise ValueError(
+                f"Rank {self.rank} is out of range for "
+                f"{self.code_length} digits and {self.num_of_colors} colors"
+            )
+
+    @classmethod
+    def unrank(cls, rank: int, code_length: int, num_of_colors: int) -> Code:
+        return cls(int(rank), code_length, num_of_colors)
+
+    @classmethod
+    def from_digits(cls, digits, num_of_colors: int) -> Code:
+        rank = 0
+        for digit in digits:
+            if not check_color(digit, num_of_colors):
+                raise ValueError(
+                    f"Digit {digit} is out of range, must be between 1 and {num_of_colors}"
+                )
+            rank = rank * num_of_colors + digit - 1
+        return cls(rank, len(digits), num_of_colors)
+
+    @classmethod
+    def from_str(cls, code: str, code_length: int, num_of_colors: int) -> Code:
+        if len(code) != code_length:
+            raise ValueError(
+                f"Code must be exactly {code_length} digits long, got '{code}'"
+            )
+        if not code.isdigit():
+            raise ValueError("Code must contain only digits")
+
+        rank = 0
+        for char in code:
+            digit = ord(char) - 48
+            if not check_color(digit, num_of_colors):
+                raise ValueError(
+                    f"Digit {digit} is out of range, must be between 1 and {num_of_colors}"
+                )
+            rank = rank * num_of_colors + digit - 1
+        return cls(rank, code_length, num_of_colors)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, code_length: int, num_of_colors: int) -> Code:
+        return cls(int.from_bytes(data, "big"), code_length, num_of_colors)
+
+    @staticmethod
+    def byte_width(code_length: int, num_of_colors: int) -> int:
+        return max(1, ((num_of_colors**code_length - 1).bit_length() + 7) // 8)
+
+    @property
+    def digits(self) -> tuple[int, ...]:
+        digits = [0] * self.code_length
+        rank = self.rank
+        for i in range(self.code_length - 1, -1, -1):
+            rank, digit = divmod(rank, self.num_of_colors)
+            digits[i] = digit + 1
+        return tuple(digits)
+
+    def to_bytes(self) -> bytes:
+        return self.rank.to_bytes(
+            self.byte_width(self.code_length, self.num_of_colors), "big"
+        )
+
+    def __len__(self) -> int:
+        return self.code_length
+
+    def __iter__(self):
+        return iter(self.digits)
+
+    def __getitem__(self, index: int) -> int:
+        return self.digits[index]
+
+    def __int__(self) -> int:
+        return self.rank
+
+    def __str__(self) -> str:
+        return "".join(map(str, self.digits))
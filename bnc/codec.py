@@ -0,0 +1,53 @@
+import json
+from collections.abc import Iterable
+from json.encoder import encode_basestring
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# compact separators and no circular-reference check: everything encoded here
+# is plain, acyclic game data
+_encoder = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+
+BACKEND = "json" if orjson is None else "orjson"
+
+
+def dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return _encoder.encode(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_array(fragments: Iterable[str]) -> str:
+    # a JSON array from already-encoded elements
+    return "[" + ",".join(fragments) + "]"
+
+
+class ObjectLayout:
+    # a JSON object whose keys are always the same and in the same order: the
+    # key prefixes are encoded once and join() only splices in values that are
+    # already encoded, so unchanged parts can be cached by the caller
+    def __init__(self, *keys: str) -> None:
+        self.keys = keys
+        self._prefixes = tuple(
+            ("{" if i == 0 else ",") + encode_basestring(key) + ":"
+            for i, key in enumerate(keys)
+        )
+
+    def join(self, fragments: Iterable[str]) -> str:
+        parts = [
+            prefix + fragment
+            for prefix, fragment in zip(self._prefixes, fragments, strict=True)
+        ]
+        if not parts:
+            return "{}"
+        return "".join(parts) + "}"
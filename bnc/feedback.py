@@ -0,0 +1,166 @@
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utils import calculate_bulls_and_cows_batch, code_space, decode_codes
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "BNC_CACHE_DIR"
+MAX_MATRIX_CODES = 10_000
+# number of (guess, secret) pairs scored per numpy call while building
+_BUILD_CHUNK = 1 << 20
+
+
+def num_of_feedbacks(code_length: int) -> int:
+    return (code_length + 1) ** 2
+
+
+def encode_feedback(bulls, cows, code_length: int):
+    return bulls * (code_length + 1) + cows
+
+
+def decode_feedback(feedback, code_length: int):
+    return divmod(feedback, code_length + 1)
+
+
+def default_cache_dir() -> Path:
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return Path(cache_dir)
+    return Path.home() / ".cache" / "bncpy"
+
+
+def is_matrix_tractable(code_length: int, num_of_colors: int) -> bool:
+    return num_of_colors**code_length <= MAX_MATRIX_CODES
+
+
+def build_feedback_matrix(code_length: int, num_of_colors: int) -> np.ndarray:
+    if not is_matrix_tractable(code_length, num_of_colors):
+        raise ValueError(
+            f"Code space {num_of_colors}^{code_length} is too large for a "
+            f"feedback matrix (limit is {MAX_MATRIX_CODES} codes)"
+        )
+
+    space = code_space(code_length, num_of_colors)
+    num_of_codes = len(space)
+    matrix = np.empty((num_of_codes, num_of_codes), dtype=np.uint8)
+
+    rows_per_chunk = max(1, _BUILD_CHUNK // num_of_codes)
+    for start in range(0, num_of_codes, rows_per_chunk):
+        guesses = space[start : start + rows_per_chunk, None, :]
+        bulls, cows = calculate_bulls_and_cows_batch(
+            space[None, :, :], guesses, num_of_colors
+        )
+        matrix[start : start + rows_per_chunk] = encode_feedback(
+            bulls, cows, code_length
+        )
+    return matrix
+
+
+def feedback_matrix_path(
+    code_length: int, num_of_colors: int, cache_dir: Path | str | None = None
+) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    return cache_dir / f"feedback_{code_length}x{num_of_colors}.npy"
+
+
+# matrices loaded by this process, by path
+_loaded_matrices: dict[Path, np.ndarray] = {}
+
+
+def _save_feedback_matrix(path: Path, code_length: int, num_of_colors: int) -> None:
+    logger.info(
+        "Building feedback matrix for %dx%d at %s", code_length, num_of_colors, path
+    )
+    matrix = build_feedback_matrix(code_length, num_of_colors)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a private file first so concurrent workers never see a
+    # partially written matrix
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, path)
+
+
+def _load_feedback_matrix(path: Path, code_length: int, num_of_colors: int):
+    matrix = _loaded_matrices.get(path)
+    if matrix is not None:
+        return matrix
+    if path.exists():
+        # a stale, truncated or foreign file is rebuilt rather than used
+        num_of_codes = num_of_colors**code_length
+        try:
+            matrix = np.load(path, mmap_mode="r")
+        except (ValueError, EOFError):
+            matrix = None
+        if (
+            matrix is None
+            or matrix.shape != (num_of_codes, num_of_codes)
+            or matrix.dtype != np.uint8
+        ):
+            logger.warning(
+                "Cached feedback matrix at %s does not match %dx%d, rebuilding",
+                path,
+                code_length,
+                num_of_colors,
+            )
+            matrix = None
+    if matrix is None:
+        _save_feedback_matrix(path, code_length, num_of_colors)
+        matrix = np.load(path, mmap_mode="r")
+    _loaded_matrices[path] = matrix
+    return matrix
+
+
+def load_feedback_matrix(
+    code_length: int, num_of_colors: int, cache_dir: Path | str | None = None
+) -> np.ndarray:
+    # rows are guesses, columns are secrets, both indexed by code rank
+    path = feedback_matrix_path(code_length, num_of_colors, cache_dir)
+    return _load_feedback_matrix(path, code_length, num_of_colors)
+
+
+def loaded_feedback_matrix(
+    code_length: int, num_of_colors: int, cache_dir: Path | str | None = None
+) -> np.ndarray | None:
+    # the matrix if this process has loaded it already; never loads or
+    # builds one
+    path = feedback_matrix_path(code_length, num_of_colors, cache_dir)
+    return _loaded_matrices.get(path)
+
+
+def score_feedback(
+    guess_codes, secret_codes, code_length: int, num_of_colors: int
+) -> np.ndarray:
+    # the same as lookup_feedback, always scored directly
+    guess_codes = np.atleast_1d(np.asarray(guess_codes, dtype=np.int64))
+    secret_codes = np.atleast_1d(np.asarray(secret_codes, dtype=np.int64))
+    bulls, cows = calculate_bulls_and_cows_batch(
+        decode_codes(secret_codes, code_length, num_of_colors)[None, :, :],
+        decode_codes(guess_codes, code_length, num_of_colors)[:, None, :],
+        num_of_colors,
+    )
+    return encode_feedback(bulls, cows, code_length).astype(np.uint8)
+
+
+def lookup_feedback(
+    guess_codes,
+    secret_codes,
+    code_length: int,
+    num_of_colors: int,
+    cache_dir: Path | str | None = None,
+) -> np.ndarray:
+    # encoded feedback shaped (len(guess_codes), len(secret_codes)); uses the
+    # cached matrix when the code space is small enough and scores directly
+    # otherwise
+    guess_codes = np.atleast_1d(np.asarray(guess_codes, dtype=np.int64))
+    secret_codes = np.atleast_1d(np.asarray(secret_codes, dtype=np.int64))
+    if not len(guess_codes) or not len(secret_codes):
+        return np.empty((len(guess_codes), len(secret_codes)), dtype=np.uint8)
+    if is_matrix_tractable(code_length, num_of_colors):
+        matrix = load_feedback_matrix(code_length, num_of_colors, cache_dir)
+        return matrix[np.ix_(guess_codes, secret_codes)]
+    return score_feedback(guess_codes, secret_codes, code_length, num_of_colors)
@@ -3,7 +3,7 @@ from collections import deque
 from enum import Enum
 
 from .player import Player
-from .utils import get_random_number
+from .sources import get_default_secret_source
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +48,9 @@ class Game:
                 )
 
     def set_random_secret_code(self) -> str:
-        new_secret_code = get_random_number(self._code_length, self._num_of_colors)
+        new_secret_code = get_default_secret_source().generate(
+            self._code_length, self._num_of_colors
+        )
         return new_secret_code
 
     def set_secret_code_for_all_players(self, secret_code: str | None) -> None:
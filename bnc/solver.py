@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .board import Board
+from .code import Code
+from .feedback import encode_feedback, lookup_feedback, num_of_feedbacks
+from .symmetry import Symmetry
+from .utils import calculate_bulls_and_cows_batch, decode_codes, encode_codes
+
+if TYPE_CHECKING:
+    from .book import OpeningBook
+
+logger = logging.getLogger(__name__)
+
+# history entries are (guess, bulls, cows), with the guess as a Code or str
+History = Iterable[tuple[Code | str, int, int]]
+
+# upper bound on (guess, secret) pairs scored per numpy call
+MAX_PAIRS_PER_CHUNK = 1 << 22
+# code spaces up to this size are filtered exactly rather than sampled
+EXACT_CANDIDATE_LIMIT = 1 << 20
+# random codes drawn for rejection sampling
+SAMPLE_BATCH = 1 << 14
+# codes hill-climbed in parallel when rejection sampling comes up short
+LOCAL_SEARCH_POPULATION = 512
+# (guess, secret) pairs scored between deadline checks by AnytimeSolver
+ANYTIME_PAIRS_PER_CHUNK = 1 << 16
+
+
+def default_opening(code_length: int, num_of_colors: int) -> Code:
+    # Knuth's 1122 generalised to other lengths: 11223, 112233, ...
+    digits = [min(i // 2 + 1, num_of_colors) for i in range(code_length)]
+    return Code.from_digits(digits, num_of_colors)
+
+
+class Solver(ABC):
+    def __init__(
+        self,
+        code_length: int = 4,
+        num_of_colors: int = 6,
+        *,
+        max_pairs: int = MAX_PAIRS_PER_CHUNK,
+        cache_dir: Path | str | None = None,
+        book: OpeningBook | None = None,
+    ) -> None:
+        if book is not None and (book.code_length, book.num_of_colors) != (
+            code_length,
+            num_of_colors,
+        ):
+            raise ValueError("Opening book configuration does not match the solver")
+        self.code_length = code_length
+        self.num_of_colors = num_of_colors
+        self.num_of_codes = num_of_colors**code_length
+        self.num_of_feedbacks = num_of_feedbacks(code_length)
+        self.max_pairs = max_pairs
+        self.cache_dir = cache_dir
+        self.book = book
+
+    def to_code(self, guess: Code | str) -> Code:
+        if isinstance(guess, Code):
+            return guess
+        return Code.from_str(guess, self.code_length, self.num_of_colors)
+
+    def encode_history(self, history: History) -> list[tuple[int, int]]:
+        return [
+            (self.to_code(guess).rank, encode_feedback(bulls, cows, self.code_length))
+            for guess, bulls, cows in history
+        ]
+
+    def feedback(self, guesses: np.ndarray, secrets: np.ndarray) -> np.ndarray:
+        return lookup_feedback(
+            guesses, secrets, self.code_length, self.num_of_colors, self.cache_dir
+        )
+
+    def candidates(self, history: History) -> np.ndarray:
+        candidates = np.arange(self.num_of_codes, dtype=np.int64)
+        for guess, feedback in self.encode_history(history):
+            candidates = candidates[self.feedback(guess, candidates)[0] == feedback]
+        return candidates
+
+    def partition_counts(
+        self, guesses: np.ndarray, candidates: np.ndarray
+    ) -> np.ndarray:
+        # counts[i, f] is how many candidates answer guesses[i] with feedback f
+        guesses = np.asarray(guesses, dtype=np.int64)
+        num_of_feedbacks = self.num_of_feedbacks
+        counts = np.empty((len(guesses), num_of_feedbacks), dtype=np.int64)
+
+        rows_per_chunk = max(1, self.max_pairs // max(1, len(candidates)))
+        for start in range(0, len(guesses), rows_per_chunk):
+            chunk = guesses[start : start + rows_per_chunk]
+            feedback = self.feedback(chunk, candidates).astype(np.int64)
+            feedback += (np.arange(len(chunk)) * num_of_feedbacks)[:, None]
+            counts[start : start + len(chunk)] = np.bincount(
+                feedback.ravel(), minlength=len(chunk) * num_of_feedbacks
+            ).reshape(len(chunk), num_of_feedbacks)
+        return counts
+
+    def guess_pool(self, history: History, candidates: np.ndarray) -> np.ndarray:
+        # one representative per class of guesses that the history cannot tell
+        # apart, as long as scoring them all stays within max_pairs
+        limit = max(1, self.max_pairs // len(candidates))
+        symmetry = Symmetry.from_guesses(
+            (self.to_code(guess) for guess, _, _ in history),
+            self.code_length,
+            self.num_of_colors,
+        )
+        pool = symmetry.representatives(limit)
+        if pool is not None:
+            return pool
+        if not history:
+            return np.array(
+                [default_opening(self.code_length, self.num_of_colors).rank]
+            )
+        # otherwise restrict the search to codes that could still be the
+        # secret, thinned out evenly if necessary
+        if len(candidates) <= limit:
+            return candidates
+        return candidates[:: -(-len(candidates) // limit)]
+
+    @abstractmethod
+    def select(self, pool: np.ndarray, candidates: np.ndarray) -> int: ...
+
+    def next_guess(
+        self, history: History = (), candidates: np.ndarray | None = None
+    ) -> Code:
+        history = list(history)
+        if self.book is not None:
+            guess = self.book.lookup(history)
+            if guess is not None:
+                return guess
+        if candidates is None:
+            candidates = self.candidates(history)
+        if len(candidates) == 0:
+            raise ValueError("No code is consistent with the given history")
+        if len(candidates) == 1:
+            return Code.unrank(candidates[0], self.code_length, self.num_of_colors)
+
+        pool = self.guess_pool(history, candidates)
+        rank = self.select(pool, candidates)
+        return Code.unrank(rank, self.code_length, self.num_of_colors)
+
+    def next_guess_for_board(self, board: Board) -> Code:
+        if (
+            board.code_length != self.code_length
+            or board.num_of_colors != self.num_of_colors
+        ):
+            raise ValueError("Board configuration does not match the solver")
+        history = [
+            (row.guess, row.bulls, row.cows) for row in board.board if row.is_filled
+        ]
+        return self.next_guess(history, board.candidates.ranks())
+
+    def solve(self, secret: Code | str, max_guesses: int = 20) -> list[Code]:
+        secret = self.to_code(secret)
+        history = []
+        guesses = []
+        while len(guesses) < max_guesses:
+            guess = self.next_guess(history)
+            guesses.append(guess)
+            if guess == secret:
+                return guesses
+            feedback = int(self.feedback(guess.rank, secret.rank)[0, 0])
+            bulls, cows = divmod(feedback, self.code_length + 1)
+            history.append((guess, bulls, cows))
+        logger.warning("Solver did not find %s in %d guesses", secret, max_guesses)
+        return guesses
+
+
+class KnuthSolver(Solver):
+    # minimax: choose the guess whose largest feedback partition is smallest,
+    # preferring guesses that could still be the secret, then the lowest rank
+    def select(self, pool: np.ndarray, candidates: np.ndarray) -> int:
+        worst_case = self.partition_counts(pool, candidates).max(axis=1)
+        best = pool[worst_case == worst_case.min()]
+        consistent = best[np.isin(best, candidates)]
+        if len(consistent):
+            return int(consistent[0])
+        return int(best[0])
+
+
+class EntropySolver(Solver):
+    # choose the guess whose feedback partition carries the most information,
+    # preferring guesses that could still be the secret, then the lowest rank
+    def partition_entropy(
+        self, guesses: np.ndarray, candidates: np.ndarray
+    ) -> np.ndarray:
+        counts = self.partition_counts(guesses, candidates)
+        probabilities = counts / len(candidates)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(counts > 0, probabilities * np.log2(probabilities), 0.0)
+        return -terms.sum(axis=1)
+
+    def select(self, pool: np.ndarray, candidates: np.ndarray) -> int:
+        entropy = self.partition_entropy(pool, candidates)
+        # a winning guess is worth a little more than its partition suggests
+        entropy += np.isin(pool, candidates) / len(candidates)
+        return int(pool[np.flatnonzero(np.isclose(entropy, entropy.max()))[0]])
+
+
+class AnytimeSolver(EntropySolver):
+    # Monte Carlo entropy search under a wall-clock budget for code spaces too
+    # large to enumerate: candidate secrets are sampled by rejection against
+    # the history, then guesses are scored against that sample in small
+    # batches until the budget runs out
+    def __init__(
+        self,
+        code_length: int = 4,
+        num_of_colors: int = 6,
+        *,
+        time_budget: float = 0.05,
+        sample_size: int = 1024,
+        seed: int | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(code_length, num_of_colors, **kwargs)
+        self.time_budget = time_budget
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+
+    def sample_candidates(self, history: History, deadline: float) -> np.ndarray:
+        return self._sample_candidates(history, deadline)[0]
+
+    def _sample_candidates(
+        self, history: History, deadline: float
+    ) -> tuple[np.ndarray, bool]:
+        # (candidates, whether they were found by enumerating every code).
+        # Code spaces up to EXACT_CANDIDATE_LIMIT are enumerated until the
+        # deadline, after which whatever was filtered so far is topped up by
+        # sampling, as for larger spaces.
+        encoded = self.encode_history(history)
+        found = []
+        if self.num_of_codes <= EXACT_CANDIDATE_LIMIT:
+            ranks, exact = self._enumerate_candidates(encoded, deadline)
+            if exact:
+                return self._thin(ranks), True
+            found.append(ranks)
+
+        ranks = self.rng.integers(0, self.num_of_codes, SAMPLE_BATCH)
+        for guess, feedback in encoded:
+            ranks = ranks[self.feedback(guess, ranks)[0] == feedback]
+        found.append(ranks)
+        if sum(map(len, found)) < self.sample_size and encoded:
+            found.append(self._local_search(encoded, deadline))
+        return self._thin(np.unique(np.concatenate(found))), False
+
+    def _thin(self, candidates: np.ndarray) -> np.ndarray:
+        if len(candidates) > self.sample_size:
+            candidates = np.sort(
+                self.rng.choice(candidates, self.sample_size, replace=False)
+            )
+        return candidates
+
+    def _enumerate_candidates(
+        self, encoded: list[tuple[int, int]], deadline: float
+    ) -> tuple[np.ndarray, bool]:
+        # every code consistent with the history, filtered a chunk of ranks
+        # at a time; chunks are taken in random order so that running out of
+        # time leaves codes from all over the code space
+        if not encoded:
+            return np.arange(self.num_of_codes, dtype=np.int64), True
+        # as many codes per chunk as a rejection sampling batch
+        chunk_size = SAMPLE_BATCH
+        starts = self.rng.permutation(range(0, self.num_of_codes, chunk_size))
+        found = []
+        for i, start in enumerate(starts):
+            if i and time.perf_counter() >= deadline:
+                return np.sort(np.concatenate(found)), False
+            ranks = np.arange(
+                start, min(start + chunk_size, self.num_of_codes), dtype=np.int64
+            )
+            for guess, feedback in encoded:
+                ranks = ranks[self.feedback(guess, ranks)[0] == feedback]
+            found.append(ranks)
+        return np.sort(np.concatenate(found)), True
+
+    def _local_search(
+        self, encoded: list[tuple[int, int]], deadline: float
+    ) -> np.ndarray:
+        # when consistent codes are too rare to hit at random, hill-climb a
+        # population of codes towards zero distance from the observed feedback
+        # with single-digit mutations, harvesting every code that gets there
+        # and restarting it from a fresh random code
+        code_length, num_of_colors = self.code_length, self.num_of_colors
+        guesses = decode_codes(
+            np.array([guess for guess, _ in encoded]), code_length, num_of_colors
+        )
+        expected = np.array(
+            [divmod(feedback, code_length + 1) for _, feedback in encoded]
+        )
+
+        def distance(digits: np.ndarray) -> np.ndarray:
+            bulls, cows = calculate_bulls_and_cows_batch(
+                digits[:, None, :], guesses[None, :, :], num_of_colors
+            )
+            return (np.abs(bulls - expected[:, 0]) + np.abs(cows - expected[:, 1])).sum(
+                axis=1
+            )
+
+        size = LOCAL_SEARCH_POPULATION
+        rows = np.arange(size)
+        population = self.rng.integers(
+            1, num_of_colors + 1, (size, code_length), dtype=np.uint8
+        )
+        scores = distance(population)
+        found: list[np.ndarray] = []
+        count = 0
+        while count < self.sample_size and time.perf_counter() < deadline:
+            mutants = population.copy()
+            mutants[rows, self.rng.integers(0, code_length, size)] = self.rng.integers(
+                1, num_of_colors + 1, size, dtype=np.uint8
+            )
+            mutant_scores = distance(mutants)
+            accept = mutant_scores <= scores
+            population[accept] = mutants[accept]
+            scores[accept] = mutant_scores[accept]
+
+            hits = scores == 0
+            if hits.any():
+                found.append(encode_codes(population[hits], num_of_colors))
+                count += int(hits.sum())
+                population[hits] = self.rng.integers(
+                    1, num_of_colors + 1, (int(hits.sum()), code_length), dtype=np.uint8
+                )
+                scores[hits] = distance(population[hits])
+
+        if not found:
+            # nothing consistent in time: the closest codes are the best
+            # stand-ins for the secret we have
+            logger.warning("No consistent code sampled within the time budget")
+            return encode_codes(population[scores == scores.min()], num_of_colors)
+        return np.concatenate(found)
+
+    def next_guess(
+        self, history: History = (), candidates: np.ndarray | None = None
+    ) -> Code:
+        deadline = time.perf_counter() + self.time_budget
+        history = list(history)
+        if self.book is not None:
+            guess = self.book.lookup(history)
+            if guess is not None:
+                return guess
+
+        exact = candidates is not None
+        if candidates is None:
+            candidates, exact = self._sample_candidates(
+                history, deadline - self.time_budget / 4
+            )
+        if exact and len(candidates) == 0:
+            raise ValueError("No code is consistent with the given history")
+        if exact and len(candidates) == 1:
+            return Code.unrank(candidates[0], self.code_length, self.num_of_colors)
+        # symmetry representatives and sampled candidates first, then random
+        # codes for as long as the budget lasts
+        symmetry = Symmetry.from_guesses(
+            (self.to_code(guess) for guess, _, _ in history),
+            self.code_length,
+            self.num_of_colors,
+        )
+        representatives = symmetry.representatives(self.sample_size)
+        pool = candidates
+        if representatives is not None:
+            pool = np.union1d(representatives, candidates)
+        # small chunks so the deadline is checked often
+        rows_per_chunk = max(
+            1,
+            ANYTIME_PAIRS_PER_CHUNK // max(len(candidates), self.num_of_feedbacks),
+        )
+
+        best_rank, best_score = int(candidates[0]), -np.inf
+        start = 0
+        while True:
+            if start >= len(pool):
+                if len(pool) >= self.num_of_codes:
+                    break
+                pool = self.rng.integers(0, self.num_of_codes, rows_per_chunk)
+                start = 0
+            chunk = pool[start : start + rows_per_chunk]
+            start += len(chunk)
+            scores = self.partition_entropy(chunk, candidates)
+            scores += np.isin(chunk, candidates) / len(candidates)
+            index = int(scores.argmax())
+            if scores[index] > best_score + 1e-9:
+                best_rank, best_score = int(chunk[index]), scores[index]
+            if time.perf_counter() >= deadline:
+                break
+        return Code.unrank(best_rank, self.code_length, self.num_of_colors)
+
+
+STRATEGIES: dict[str, type[Solver]] = {
+    "knuth": KnuthSolver,
+    "entropy": EntropySolver,
+    "anytime": AnytimeSolver,
+}
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+
+from .utils import (
+    RANDOM_ORG_ERRORS,
+    RANDOM_ORG_MAX_BATCH,
+    RANDOM_ORG_URL,
+    fetch_random_integers,
+    fetch_random_integers_async,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SecretSource(ABC):
+    @abstractmethod
+    def generate(self, code_length: int, num_of_colors: int) -> str: ...
+
+    async def generate_async(self, code_length: int, num_of_colors: int) -> str:
+        return self.generate(code_length, num_of_colors)
+
+
+class LocalSecretSource(SecretSource):
+    # the OS CSPRNG; no I/O, so secrets cost microseconds
+    def generate(self, code_length: int, num_of_colors: int) -> str:
+        return "".join(
+            str(secrets.randbelow(num_of_colors) + 1) for _ in range(code_length)
+        )
+
+
+def _check_watermarks(low_watermark: int, high_watermark: int) -> None:
+    if not 0 <= low_watermark < high_watermark <= RANDOM_ORG_MAX_BATCH:
+        raise ValueError(
+            "Watermarks must satisfy "
+            f"0 <= low_watermark < high_watermark <= {RANDOM_ORG_MAX_BATCH}"
+        )
+
+
+def _loop_is_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class RandomNumberPool:
+    # integers in [min_value, max_value] fetched from random.org in bulk and
+    # handed out from memory. Dropping below low_watermark schedules a
+    # background refill up to high_watermark when an event loop is running;
+    # without one, the take that runs short refills synchronously. A take
+    # that runs short inside a running loop never blocks it: the shortfall
+    # is covered locally, as it is when the remote fails.
+    def __init__(
+        self,
+        min_value: int,
+        max_value: int,
+        *,
+        low_watermark: int = 256,
+        high_watermark: int = 4096,
+        url: str = RANDOM_ORG_URL,
+        timeout: float = 5.0,
+    ) -> None:
+        if min_value >= max_value:
+            raise ValueError(
+                f"min_value ({min_value}) must be less than max_value ({max_value})."
+            )
+        _check_watermarks(low_watermark, high_watermark)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.url = url
+        self.timeout = timeout
+        self._buffer: deque[int] = deque()
+        self._lock = threading.Lock()
+        self._refill_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _shortfall(self) -> int:
+        return self.high_watermark - len(self._buffer)
+
+    def refill(self) -> int:
+        count = self._shortfall()
+        if count <= 0:
+            return 0
+        numbers = fetch_random_integers(
+            count, self.min_value, self.max_value, url=self.url, timeout=self.timeout
+        )
+        self._buffer.extend(numbers)
+        return len(numbers)
+
+    async def refill_async(self) -> int:
+        count = self._shortfall()
+        if count <= 0:
+            return 0
+        numbers = await fetch_random_integers_async(
+            count, self.min_value, self.max_value, url=self.url, timeout=self.timeout
+        )
+        self._buffer.extend(numbers)
+        return len(numbers)
+
+    async def _refill_in_background(self) -> None:
+        try:
+            await self.refill_async()
+        except RANDOM_ORG_ERRORS as e:
+            logger.warning("Failed to refill random number pool: %s", e)
+
+    def _schedule_refill(self) -> None:
+        if len(self._buffer) >= self.low_watermark:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refill_task = loop.create_task(self._refill_in_background())
+
+    def _pop_available(self, count: int) -> list[int]:
+        with self._lock:
+            return [
+                self._buffer.popleft() for _ in range(min(count, len(self._buffer)))
+            ]
+
+    def _pop(self, count: int) -> list[int] | None:
+        with self._lock:
+            if len(self._buffer) < count:
+                return None
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _local(self, count: int) -> list[int]:
+        span = self.max_value - self.min_value + 1
+        return [self.min_value + secrets.randbelow(span) for _ in range(count)]
+
+    def take(self, count: int) -> list[int]:
+        numbers = self._pop(count)
+        if numbers is None and _loop_is_running():
+            numbers = self._pop_available(count)
+            numbers += self._local(count - len(numbers))
+        elif numbers is None:
+            try:
+                self.refill()
+            except RANDOM_ORG_ERRORS as e:
+                logger.warning(
+                    "Failed to refill random number pool: %s, "
+                    "falling back to local generation",
+                    e,
+                )
+            numbers = self._pop(count)
+            if numbers is None:
+                numbers = self._local(count)
+        self._schedule_refill()
+        return numbers
+
+    async def take_async(self, count: int) -> list[int]:
+        numbers = self._pop(count)
+        if numbers is None:
+            if self._refill_task is not None and not self._refill_task.done():
+                await self._refill_task
+            numbers = self._pop(count)
+        if numbers is None:
+            await self._refill_in_background()
+            numbers = self._pop(count)
+            if numbers is None:
+                numbers = self._local(count)
+        self._schedule_refill()
+        return numbers
+
+
+class RandomOrgSecretSource(SecretSource):
+    # opt-in remote source. Digits come from one pool per color count, so a
+    # secret is normally a buffer pop rather than a request per game.
+    def __init__(
+        self,
+        url: str = RANDOM_ORG_URL,
+        timeout: float = 5.0,
+        *,
+        low_watermark: int = 256,
+        high_watermark: int = 4096,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self._pools: dict[int, RandomNumberPool] = {}
+        _check_watermarks(low_watermark, high_watermark)
+
+    def pool(self, num_of_colors: int) -> RandomNumberPool:
+        pool = self._pools.get(num_of_colors)
+        if pool is None:
+            pool = self._pools[num_of_colors] = RandomNumberPool(
+                1,
+                num_of_colors,
+                low_watermark=self.low_watermark,
+                high_watermark=self.high_watermark,
+                url=self.url,
+                timeout=self.timeout,
+            )
+        return pool
+
+    def generate(self, code_length: int, num_of_colors: int) -> str:
+        return "".join(map(str, self.pool(num_of_colors).take(code_length)))
+
+    async def generate_async(self, code_length: int, num_of_colors: int) -> str:
+        digits = await self.pool(num_of_colors).take_async(code_length)
+        return "".join(map(str, digits))
+
+
+_default_secret_source: SecretSource = LocalSecretSource()
+
+
+def get_default_secret_source() -> SecretSource:
+    return _default_secret_source
+
+
+def set_default_secret_source(source: SecretSource) -> None:
+    global _default_secret_source
+    _default_secret_source = source
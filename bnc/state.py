@@ -1,14 +1,36 @@
 from __future__ import annotations
 
+import copy
+import struct
+import sys
+import time
+import weakref
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, MutableSequence, Sequence
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-import jsonpickle
+import numpy as np
 
-from . import Board, Game, Player
-from .utils import calculate_bulls_and_cows, get_random_number, validate_code_input
+from . import Board, Game, Player, codec
+from .candidates import CandidateSet
+from .code import Code
+from .solver import Solver
+from .sources import SecretSource, get_default_secret_source
+from .utils import (
+    calculate_bulls_and_cows,
+    color_histogram,
+    decode_codes,
+    validate_code_input,
+)
+
+if TYPE_CHECKING:
+    from .tree import DecisionTree
 
 
 class GameMode(Enum):
@@ -16,13 +38,169 @@ class GameMode(Enum):
     MULTI_BOARD = "MULTI_BOARD"
 
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_micros(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def _from_epoch_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _now_micros() -> int:
+    return time.time_ns() // 1000
+
+
+class _Owner:
+    # what a GameState's records and containers report in-place changes to.
+    # It holds the state weakly, so they do not keep it alive, and changes
+    # made inside `with owner:` (the state's own bookkeeping) are not
+    # reported. The guess history has an owner of its own, `history`, whose
+    # changes also reset the per-guess caches; changes anywhere else only
+    # move the version.
+    __slots__ = ("_state", "_quiet", "_main", "history")
+
+    def __init__(self, state: GameState, main: _Owner | None = None) -> None:
+        self._state = weakref.ref(state)
+        self._quiet = 0
+        self._main = self if main is None else main
+        self.history = _Owner(state, self) if main is None else self
+
+    def __enter__(self) -> None:
+        self._main._quiet += 1
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._main._quiet -= 1
+
+    def changed(self) -> None:
+        if not self._main._quiet:
+            state = self._state()
+            if state is None:
+                return
+            if self is self._main:
+                state._bump(snapshot=True)
+            else:
+                state.mark_dirty()
+
+    def own(self, value):
+        # value as belonging to this owner: records and guess containers
+        # nobody owns are adopted, ones another state owns are copied, and
+        # lists and dicts are copied into ones that report changes. Of the
+        # state's own, whatever is in the history stays the history's.
+        if isinstance(value, _OwnedList | _OwnedDict) and value._owner is self:
+            return value
+        if isinstance(value, list):
+            return _OwnedList(self, value)
+        if isinstance(value, dict):
+            return _OwnedDict(self, value)
+        if not isinstance(
+            value, PlayerGuess | PlayerState | LazyGuessList | GuessLog | PlayerTable
+        ):
+            return value
+        current = value._owner
+        if current is not None and current._main is self._main:
+            if self is not self._main:
+                value._adopt(self)
+            return value
+        if current is not None:
+            if isinstance(value, PlayerGuess | PlayerState):
+                value = value._copy()
+            else:
+                value = copy.deepcopy(value)
+        value._adopt(self)
+        return value
+
+
+def _report_change(owner: _Owner | None) -> None:
+    if owner is not None:
+        owner.changed()
+
+
+@dataclass(slots=True, init=False, eq=False)
 class PlayerGuess:
+    # rooms hold many of these: no instance dict, the timestamp kept as UTC
+    # epoch microseconds (an int is much smaller than a datetime) and the
+    # strings interned, since every room repeats the same codes and names
     guess: str
     bulls: int
     cows: int
     player: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp_us: int
+    # set while a GameState owns the guess, so editing it in place is seen
+    _owner: _Owner | None = field(default=None, repr=False)
+
+    def __init__(
+        self,
+        guess: str,
+        bulls: int,
+        cows: int,
+        player: str,
+        timestamp: datetime | None = None,
+        *,
+        timestamp_us: int | None = None,
+    ) -> None:
+        if timestamp_us is None:
+            timestamp_us = (
+                _now_micros() if timestamp is None else _to_epoch_micros(timestamp)
+            )
+        # set through object so read-only subclasses can be built too
+        set_field = object.__setattr__
+        set_field(self, "guess", sys.intern(guess))
+        set_field(self, "bulls", bulls)
+        set_field(self, "cows", cows)
+        set_field(self, "player", sys.intern(player))
+        set_field(self, "timestamp_us", timestamp_us)
+        set_field(self, "_owner", None)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        object.__setattr__(self, name, value)
+        _report_change(getattr(self, "_owner", None))
+
+    # copies and pickles belong to no state
+    def __getstate__(self) -> tuple:
+        return self._fields()
+
+    def __setstate__(self, state: tuple) -> None:
+        guess, bulls, cows, player, timestamp_us = state
+        PlayerGuess.__init__(
+            self, guess, bulls, cows, player, timestamp_us=timestamp_us
+        )
+
+    def _adopt(self, owner: _Owner) -> None:
+        object.__setattr__(self, "_owner", owner)
+
+    def _copy(self) -> PlayerGuess:
+        return PlayerGuess(
+            self.guess,
+            self.bulls,
+            self.cows,
+            self.player,
+            timestamp_us=self.timestamp_us,
+        )
+
+    def _fields(self) -> tuple:
+        return self.guess, self.bulls, self.cows, self.player, self.timestamp_us
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlayerGuess):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    @property
+    def timestamp(self) -> datetime:
+        # naive timestamps are taken as UTC; all are returned in UTC
+        return _from_epoch_micros(self.timestamp_us)
+
+    @timestamp.setter
+    def timestamp(self, timestamp: datetime) -> None:
+        self.timestamp_us = _to_epoch_micros(timestamp)
 
     def to_dict(self):
         return {
@@ -50,19 +228,568 @@ class PlayerGuess:
         )
 
 
-@dataclass
+class LazyGuessList(MutableSequence):
+    # a list of PlayerGuess over raw guess dicts (as written by
+    # PlayerGuess.to_dict). Entries are decoded on first access and kept;
+    # appended guesses are stored as they are. Anything other than reading
+    # and appending turns it into a plain list internally.
+    def __init__(self, raw: Sequence[dict]) -> None:
+        self._raw = raw
+        self._decoded: dict[int, PlayerGuess] = {}
+        self._tail: list[PlayerGuess] = []
+        self._items: list[PlayerGuess] | None = None
+        self._owner: _Owner | None = None
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_owner": None}
+
+    def _adopt(self, owner: _Owner) -> None:
+        # the entries decoded or appended so far become owner's too
+        self._owner = owner
+        self._decoded = {i: owner.own(e) for i, e in self._decoded.items()}
+        self._tail = [owner.own(entry) for entry in self._tail]
+        if self._items is not None:
+            self._items = [owner.own(entry) for entry in self._items]
+
+    def _own(self, value: PlayerGuess) -> PlayerGuess:
+        return value if self._owner is None else self._owner.own(value)
+
+    def __len__(self) -> int:
+        if self._items is not None:
+            return len(self._items)
+        return len(self._raw) + len(self._tail)
+
+    def _get(self, index: int) -> PlayerGuess:
+        if index < len(self._raw):
+            entry = self._decoded.get(index)
+            if entry is None:
+                entry = self._decoded[index] = self._own(
+                    PlayerGuess.from_dict(self._raw[index])
+                )
+            return entry
+        return self._tail[index - len(self._raw)]
+
+    def __getitem__(self, index):
+        if self._items is not None:
+            return self._items[index]
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("guess index out of range")
+        return self._get(index)
+
+    def _materialize(self) -> list[PlayerGuess]:
+        if self._items is None:
+            self._items = [self._get(i) for i in range(len(self))]
+            self._raw, self._decoded, self._tail = (), {}, []
+        return self._items
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            value = [self._own(entry) for entry in value]
+        else:
+            value = self._own(value)
+        self._materialize()[index] = value
+        _report_change(self._owner)
+
+    def __delitem__(self, index) -> None:
+        del self._materialize()[index]
+        _report_change(self._owner)
+
+    def insert(self, index: int, value: PlayerGuess) -> None:
+        value = self._own(value)
+        if self._items is None and index >= len(self):
+            self._tail.append(value)
+        else:
+            self._materialize().insert(index, value)
+        _report_change(self._owner)
+
+    def append(self, value: PlayerGuess) -> None:
+        value = self._own(value)
+        if self._items is None:
+            self._tail.append(value)
+        else:
+            self._items.append(value)
+        _report_change(self._owner)
+
+    def to_dicts(self, start: int = 0) -> list[dict]:
+        # PlayerGuess.to_dict of every entry from start on; raw dicts not
+        # decoded yet are passed through as they are
+        if self._items is not None:
+            return [entry.to_dict() for entry in self._items[start:]]
+        raw, decoded = self._raw, self._decoded
+        dicts = [
+            decoded[i].to_dict() if i in decoded else raw[i]
+            for i in range(start, len(raw))
+        ]
+        dicts += [entry.to_dict() for entry in self._tail[max(0, start - len(raw)) :]]
+        return dicts
+
+    def players_and_bulls(self) -> Iterator[tuple[str, int]]:
+        # what the status counters need, read without decoding entries
+        if self._items is not None:
+            for entry in self._items:
+                yield entry.player, entry.bulls
+            return
+        for data in self._raw:
+            yield data["player"], data["bulls"]
+        for entry in self._tail:
+            yield entry.player, entry.bulls
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other, strict=True)
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LazyGuessList({list(self)!r})"
+
+
+class _GuessView(PlayerGuess):
+    # a GuessLog entry: a copy of one row, so assigning to it raises rather
+    # than silently leaving the log unchanged
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(
+            "GuessLog entries are read-only; assign log[index] = entry to change one"
+        )
+
+
+def _to_dicts(guesses: Sequence[PlayerGuess], start: int = 0) -> list[dict]:
+    # PlayerGuess.to_dict of guesses from start on
+    if isinstance(guesses, GuessLog | LazyGuessList):
+        return guesses.to_dicts(start)
+    return [entry.to_dict() for entry in guesses[start:]]
+
+
+def _history(
+    guesses: Sequence[PlayerGuess], start: int = 0, player: str | None = None
+) -> list[tuple[str, int, int]]:
+    # (guess, bulls, cows) of guesses from start on, only player's if given
+    if isinstance(guesses, GuessLog):
+        return guesses.history(start, player)
+    return [
+        (entry.guess, entry.bulls, entry.cows)
+        for entry in guesses[start:]
+        if player is None or entry.player == player
+    ]
+
+
+class PlayerTable(MutableSequence):
+    # the players in a room, in joining order, as a list of names with O(1)
+    # membership and removal. Every name the table has seen, including
+    # players since removed and guessers who never joined, keeps a small
+    # integer id for the table's lifetime, so guess records can refer to
+    # players by id. The table only grows: removing players, clear() and
+    # reordering change which ids are current, never the ids themselves.
+    __slots__ = ("names", "_ids", "_active", "_order", "_owner")
+
+    def __init__(self, players: Iterable[str] = ()) -> None:
+        self.names: list[str] = []
+        self._ids: dict[str, int] = {}
+        # ids of the current players, in order, and the same as a list for
+        # indexing, built on demand
+        self._active: dict[int, None] = {}
+        self._order: list[int] | None = None
+        self._owner: _Owner | None = None
+        self.extend(players)
+
+    def __getstate__(self) -> dict:
+        return {
+            name: getattr(self, name) for name in self.__slots__ if name != "_owner"
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self._owner = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _adopt(self, owner: _Owner) -> None:
+        self._owner = owner
+
+    def id(self, name: str) -> int:
+        player_id = self._ids.get(name)
+        if player_id is None:
+            player_id = self._ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return player_id
+
+    def get_id(self, name: str) -> int | None:
+        return self._ids.get(name)
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.names
+        return (names[player_id] for player_id in self._active)
+
+    def __contains__(self, name: object) -> bool:
+        return self._ids.get(name) in self._active
+
+    def _ordered(self) -> list[int]:
+        if self._order is None:
+            self._order = list(self._active)
+        return self._order
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.names[player_id] for player_id in self._ordered()[index]]
+        return self.names[self._ordered()[index]]
+
+    def _replace(self, names: list[str]) -> None:
+        self._active = dict.fromkeys(self.id(name) for name in names)
+        self._order = None
+        _report_change(self._owner)
+
+    def __setitem__(self, index, value) -> None:
+        names = list(self)
+        names[index] = value
+        self._replace(names)
+
+    def __delitem__(self, index) -> None:
+        names = list(self)
+        del names[index]
+        self._replace(names)
+
+    def insert(self, index: int, value: str) -> None:
+        names = list(self)
+        names.insert(index, value)
+        self._replace(names)
+
+    def append(self, value: str) -> None:
+        # a name that is already present keeps its place
+        player_id = self.id(value)
+        if player_id not in self._active:
+            self._active[player_id] = None
+            if self._order is not None:
+                self._order.append(player_id)
+            _report_change(self._owner)
+
+    def remove(self, value: str) -> None:
+        player_id = self._ids.get(value)
+        if player_id not in self._active:
+            raise ValueError(f"{value!r} is not a player")
+        del self._active[player_id]
+        self._order = None
+        _report_change(self._owner)
+
+    def clear(self) -> None:
+        self._active.clear()
+        self._order = None
+        _report_change(self._owner)
+
+    def count(self, value: str) -> int:
+        return int(value in self)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PlayerTable({list(self)!r})"
+
+
+class GuessLog(MutableSequence):
+    # guesses stored column by column in arrays: an id into a table of the
+    # distinct codes, the player's id in a PlayerTable, bulls, cows and
+    # epoch microseconds. Reading an entry builds a read-only PlayerGuess
+    # from the columns; to change a guess assign a whole entry back
+    # (log[i] = entry). The code table and the player table only grow:
+    # deleting guesses or rebinding with use_players never compacts them.
+    def __init__(
+        self,
+        guesses: Iterable[PlayerGuess] = (),
+        *,
+        players: PlayerTable | None = None,
+    ) -> None:
+        self.code_table: list[str] = []
+        self._code_ids: dict[str, int] = {}
+        self.players = PlayerTable() if players is None else players
+        # (code_length, num_of_colors, rank of each code_table entry)
+        self._ranks: tuple[int, int, array] | None = None
+        self.code_id = array("I")
+        self.player_id = array("I")
+        self.bulls = array("B")
+        self.cows = array("B")
+        self.timestamp_us = array("q")
+        self._owner: _Owner | None = None
+        self.extend(guesses)
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_owner": None}
+
+    def _adopt(self, owner: _Owner) -> None:
+        self._owner = owner
+
+    @classmethod
+    def from_columns(
+        cls,
+        code_table: list[str],
+        player_table: list[str],
+        *columns: Iterable[int],
+    ) -> GuessLog:
+        # columns are code_id, player_id, bulls, cows and timestamp_us, as
+        # sequences or numpy arrays
+        log = cls()
+        for code in code_table:
+            log._code(code)
+        for name in player_table:
+            log.players.id(name)
+        for column, values in zip(log._columns(), columns, strict=True):
+            column.frombytes(np.asarray(values, dtype=column.typecode).tobytes())
+        return log
+
+    def _code(self, code: str) -> int:
+        code_id = self._code_ids.get(code)
+        if code_id is None:
+            code_id = self._code_ids[code] = len(self.code_table)
+            self.code_table.append(sys.intern(code))
+        return code_id
+
+    @property
+    def player_table(self) -> list[str]:
+        return self.players.names
+
+    def use_players(self, players: PlayerTable) -> None:
+        # refer to players by their ids in another table from now on; the
+        # other table gains every name in this one, including names no
+        # guess refers to any more
+        if players is self.players:
+            return
+        remap = np.array([players.id(name) for name in self.player_table], dtype="I")
+        player_id = array("I")
+        player_id.frombytes(remap[np.frombuffer(self.player_id, dtype="I")].tobytes())
+        self.player_id, self.players = player_id, players
+
+    def _columns(self) -> tuple[array, ...]:
+        return self.code_id, self.player_id, self.bulls, self.cows, self.timestamp_us
+
+    def _row(self, entry: PlayerGuess) -> tuple[int, ...]:
+        return (
+            self._code(entry.guess),
+            self.players.id(entry.player),
+            entry.bulls,
+            entry.cows,
+            entry.timestamp_us,
+        )
+
+    def __len__(self) -> int:
+        return len(self.code_id)
+
+    def _get(self, index: int) -> PlayerGuess:
+        return _GuessView(
+            self.code_table[self.code_id[index]],
+            self.bulls[index],
+            self.cows[index],
+            self.player_table[self.player_id[index]],
+            timestamp_us=self.timestamp_us[index],
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        return self._get(index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            rows = [self._row(entry) for entry in value]
+            for i, column in enumerate(self._columns()):
+                column[index] = array(column.typecode, [row[i] for row in rows])
+        else:
+            for column, field_value in zip(
+                self._columns(), self._row(value), strict=True
+            ):
+                column[index] = field_value
+        _report_change(self._owner)
+
+    def __delitem__(self, index) -> None:
+        for column in self._columns():
+            del column[index]
+        _report_change(self._owner)
+
+    def insert(self, index: int, value: PlayerGuess) -> None:
+        for column, field_value in zip(self._columns(), self._row(value), strict=True):
+            column.insert(index, field_value)
+        _report_change(self._owner)
+
+    def record(
+        self,
+        guess: str,
+        bulls: int,
+        cows: int,
+        player: str,
+        timestamp_us: int | None = None,
+    ) -> None:
+        # append without building a PlayerGuess
+        self.code_id.append(self._code(guess))
+        self.player_id.append(self.players.id(player))
+        self.bulls.append(bulls)
+        self.cows.append(cows)
+        self.timestamp_us.append(
+            _now_micros() if timestamp_us is None else timestamp_us
+        )
+        _report_change(self._owner)
+
+    def append(self, value: PlayerGuess) -> None:
+        self.record(
+            value.guess, value.bulls, value.cows, value.player, value.timestamp_us
+        )
+
+    def counts_by_player(self) -> Counter[str]:
+        return Counter(
+            {
+                self.player_table[player_id]: count
+                for player_id, count in Counter(self.player_id).items()
+            }
+        )
+
+    def history(
+        self, start: int = 0, player: str | None = None
+    ) -> list[tuple[str, int, int]]:
+        # (guess, bulls, cows) from start on, only player's if given
+        codes = self.code_table
+        rows = zip(
+            self.code_id[start:], self.bulls[start:], self.cows[start:], strict=True
+        )
+        if player is None:
+            return [(codes[code_id], bulls, cows) for code_id, bulls, cows in rows]
+        player_id = self.players.get_id(player)
+        return [
+            (codes[code_id], bulls, cows)
+            for (code_id, bulls, cows), other in zip(
+                rows, self.player_id[start:], strict=True
+            )
+            if other == player_id
+        ]
+
+    def to_dicts(self, start: int = 0) -> list[dict]:
+        # PlayerGuess.to_dict of every entry from start on
+        codes, names = self.code_table, self.player_table
+        return [
+            {
+                "guess": codes[code_id],
+                "bulls": bulls,
+                "cows": cows,
+                "player": names[player_id],
+                "timestamp": _from_epoch_micros(micros).isoformat(),
+            }
+            for code_id, player_id, bulls, cows, micros in zip(
+                *(column[start:] for column in self._columns()), strict=True
+            )
+        ]
+
+    def ranks(self, code_length: int, num_of_colors: int) -> array:
+        # Code rank of every code_table entry; kept, and extended as the
+        # table grows
+        cached = self._ranks
+        if cached is None or cached[:2] != (code_length, num_of_colors):
+            cached = self._ranks = (code_length, num_of_colors, array("Q"))
+        ranks = cached[2]
+        for code in self.code_table[len(ranks) :]:
+            ranks.append(Code.from_str(code, code_length, num_of_colors).rank)
+        return ranks
+
+    def pack_records(
+        self,
+        start: int,
+        code_length: int,
+        num_of_colors: int,
+        name_index: Callable[[str], int],
+    ) -> bytes:
+        # snapshot guess records of every entry from start on, with player
+        # names numbered by name_index
+        dtype = _guess_record(code_length, num_of_colors)[2]
+        records = np.empty(len(self) - start, dtype=dtype)
+        if not len(records):
+            return b""
+
+        def column(values: array) -> np.ndarray:
+            return np.frombuffer(values[start:], dtype=values.typecode)
+
+        ranks = self.ranks(code_length, num_of_colors)
+        names = array("I", [name_index(name) for name in self.player_table])
+        records["rank"] = np.frombuffer(ranks, dtype=ranks.typecode)[
+            column(self.code_id)
+        ]
+        records["player"] = np.frombuffer(names, dtype=names.typecode)[
+            column(self.player_id)
+        ]
+        records["bulls"] = column(self.bulls)
+        records["cows"] = column(self.cows)
+        records["micros"] = column(self.timestamp_us)
+        return records.tobytes()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other, strict=True)
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"GuessLog({list(self)!r})"
+
+
+@dataclass(slots=True)
 class PlayerState:
+    # first, so it is set before __init__ assigns anything else
+    _owner: _Owner | None = field(default=None, init=False, repr=False, compare=False)
     name: str
-    guesses: list[PlayerGuess] = field(default_factory=list)
+    guesses: MutableSequence[PlayerGuess] = field(default_factory=list)
     current_row: int = 0
     game_over: bool = False
     game_won: bool = False
     remaining_guesses: int = 10
 
+    def __setattr__(self, name: str, value: object) -> None:
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            value = owner.own(value)
+        object.__setattr__(self, name, value)
+        _report_change(owner)
+
+    def __getstate__(self) -> dict:
+        return {
+            name: getattr(self, name) for name in self.__slots__ if name != "_owner"
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        object.__setattr__(self, "_owner", None)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def _adopt(self, owner: _Owner) -> None:
+        object.__setattr__(self, "_owner", owner)
+        object.__setattr__(self, "guesses", owner.own(self.guesses))
+
+    def _copy(self) -> PlayerState:
+        guesses = self.guesses
+        return PlayerState(
+            name=self.name,
+            guesses=list(guesses) if isinstance(guesses, list) else guesses,
+            current_row=self.current_row,
+            game_over=self.game_over,
+            game_won=self.game_won,
+            remaining_guesses=self.remaining_guesses,
+        )
+
     def to_dict(self):
         return {
             "name": self.name,
-            "guesses": [g.to_dict() for g in self.guesses],
+            "guesses": _to_dicts(self.guesses),
             "current_row": self.current_row,
             "game_over": self.game_over,
             "game_won": self.game_won,
@@ -70,8 +797,11 @@ class PlayerState:
         }
 
     @classmethod
-    def from_dict(cls, data: dict):
-        guesses = [PlayerGuess.from_dict(g) for g in data.get("guesses", [])]
+    def from_dict(cls, data: dict, *, lazy: bool = False):
+        if lazy:
+            guesses = LazyGuessList(data.get("guesses", []))
+        else:
+            guesses = [PlayerGuess.from_dict(g) for g in data.get("guesses", [])]
         return cls(
             name=data["name"],
             guesses=guesses,
@@ -82,6 +812,97 @@ class PlayerState:
         )
 
 
+def _reporting(method: Callable) -> Callable:
+    # method, followed by reporting the change to the container's owner
+    def report(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._owner.changed()
+        return result
+
+    report.__name__ = method.__name__
+    return report
+
+
+class _OwnedList(list):
+    # a list belonging to a GameState: changes are reported to it and
+    # guesses put in it become the state's
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: _Owner, items: Iterable = ()) -> None:
+        self._owner = owner
+        super().__init__(owner.own(item) for item in items)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            value = [self._owner.own(item) for item in value]
+        else:
+            value = self._owner.own(value)
+        super().__setitem__(index, value)
+        self._owner.changed()
+
+    def append(self, item) -> None:
+        super().append(self._owner.own(item))
+        self._owner.changed()
+
+    def insert(self, index: int, item) -> None:
+        super().insert(index, self._owner.own(item))
+        self._owner.changed()
+
+    def extend(self, items: Iterable) -> None:
+        super().extend([self._owner.own(item) for item in items])
+        self._owner.changed()
+
+    def __iadd__(self, items: Iterable) -> _OwnedList:
+        self.extend(items)
+        return self
+
+    def __reduce__(self) -> tuple:
+        return list, (list(self),)
+
+    __delitem__ = _reporting(list.__delitem__)
+    __imul__ = _reporting(list.__imul__)
+    pop = _reporting(list.pop)
+    remove = _reporting(list.remove)
+    clear = _reporting(list.clear)
+    sort = _reporting(list.sort)
+    reverse = _reporting(list.reverse)
+
+
+class _OwnedDict(dict):
+    # the same for player_states
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: _Owner, items: dict) -> None:
+        self._owner = owner
+        super().__init__((key, owner.own(value)) for key, value in items.items())
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, self._owner.own(value))
+        self._owner.changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, self._owner.own(value))
+        self._owner.changed()
+
+    def __ior__(self, other) -> _OwnedDict:
+        self.update(other)
+        return self
+
+    def __reduce__(self) -> tuple:
+        return dict, (dict(self),)
+
+    __delitem__ = _reporting(dict.__delitem__)
+    pop = _reporting(dict.pop)
+    popitem = _reporting(dict.popitem)
+    clear = _reporting(dict.clear)
+
+
 @dataclass
 class GameConfig:
     code_length: int = 4
@@ -89,6 +910,8 @@ class GameConfig:
     num_of_guesses: int = 10
     secret_code: str | None = None
     game_type: int = 1  # TODO : validate
+    # None uses the process-wide default (local CSPRNG unless replaced)
+    secret_source: SecretSource | None = field(default=None, repr=False, compare=False)
 
     def validate(self):
         if self.code_length < 3:
@@ -105,7 +928,8 @@ class GameConfig:
             raise ValueError(f"secret_code must be {self.code_length} digits long")
 
     def generate_secret_code(self) -> str:
-        return get_random_number(length=self.code_length, max_value=self.num_of_colors)
+        source = self.secret_source or get_default_secret_source()
+        return source.generate(self.code_length, self.num_of_colors)
 
     def to_dict(self) -> dict:
         return {
@@ -128,54 +952,407 @@ class GameConfig:
         )
 
     def to_json(self) -> str:
-        return jsonpickle.dumps(self.to_dict())
+        return codec.dumps(self.to_dict())
 
     @classmethod
     def from_json(cls, json_str: str) -> GameConfig:
-        data = jsonpickle.loads(json_str)
+        data = codec.loads(json_str)
         print(data)
         return cls.from_dict(data)
 
 
+# binary snapshots (GameState.to_bytes): a header, a table of every player
+# name, then players, winners, guesses and player states referring to names
+# by index. All integers are little-endian; bump SNAPSHOT_FORMAT_VERSION
+# whenever the layout changes.
+SNAPSHOT_FORMAT_VERSION = 1
+_SNAPSHOT_MAGIC = b"BNCS"
+# magic, format version, mode, game_started, game_type, code_length,
+# num_of_colors, num_of_guesses, state version
+_SNAPSHOT_HEADER = struct.Struct("<4sBBBBBBHQ")
+_U32 = struct.Struct("<I")
+# name index, current_row, remaining_guesses, game_over, game_won
+_PLAYER_STATE_RECORD = struct.Struct("<IIiBB")
+_MODES = tuple(GameMode)
+
+
+_RANK_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+@lru_cache(maxsize=None)
+def _guess_record(
+    code_length: int, num_of_colors: int
+) -> tuple[struct.Struct, struct.Struct, np.dtype]:
+    # (code rank, guess record, the record as a numpy dtype). A record is the
+    # code rank in the narrowest unsigned int that holds every code, bulls,
+    # cows, player name index and epoch microseconds.
+    width = Code.byte_width(code_length, num_of_colors)
+    size = next((size for size in _RANK_FORMATS if size >= width), None)
+    if size is None:
+        raise ValueError(
+            f"Codes of {code_length} digits and {num_of_colors} colors are too "
+            "large for snapshots"
+        )
+    rank_format = _RANK_FORMATS[size]
+    return (
+        struct.Struct(f"<{rank_format}"),
+        struct.Struct(f"<{rank_format}BBIq"),
+        np.dtype(
+            [
+                ("rank", f"<u{size}"),
+                ("bulls", "u1"),
+                ("cows", "u1"),
+                ("player", "<u4"),
+                ("micros", "<i8"),
+            ]
+        ),
+    )
+
+
+def _pack_guess_records(
+    guesses: Sequence[PlayerGuess],
+    start: int,
+    code_length: int,
+    num_of_colors: int,
+    name_index: Callable[[str], int],
+) -> bytes:
+    # snapshot records of guesses from start on, with player names numbered
+    # by name_index
+    if isinstance(guesses, GuessLog):
+        return guesses.pack_records(start, code_length, num_of_colors, name_index)
+    record = _guess_record(code_length, num_of_colors)[1]
+    return b"".join(
+        record.pack(
+            Code.from_str(entry.guess, code_length, num_of_colors).rank,
+            entry.bulls,
+            entry.cows,
+            name_index(entry.player),
+            entry.timestamp_us,
+        )
+        for entry in guesses[start:]
+    )
+
+
+_STATE_LAYOUT = codec.ObjectLayout(
+    "config",
+    "mode",
+    "players",
+    "guesses",
+    "game_over",
+    "game_won",
+    "winners",
+    "game_started",
+    "current_row",
+    "remaining_guesses",
+    "secret_code",
+    "players_data",
+    "version",
+)
+
+
 class GameState:
     def __init__(
         self,
         config: GameConfig,
         *,
         mode: GameMode = GameMode.SINGLE_BOARD,
-        players: list[str] | None = None,
+        players: Iterable[str] | None = None,
         player_states: dict[str, PlayerState] | None = None,
-        all_guesses: list[PlayerGuess] | None = None,
+        all_guesses: MutableSequence[PlayerGuess] | None = None,
         winners: list[str] | None = None,
         game_started: bool | None = None,
     ) -> None:
         self.config = config
         self.config.validate()
-        self.mode = mode
-        self.players = players or []
-        self.player_states = player_states or {}
-        self.all_guesses = all_guesses or []
-        self.winners = winners or []
-        self.game_started = False if game_started is None else game_started
+        self._mode = mode
+        # the records and containers below belong to the state: changing
+        # them in place marks it dirty, see _Owner
+        self._owner = _Owner(self)
+        self._players = self._owner.own(PlayerTable(players or ()))
+        self._player_states = self._owner.own(dict(player_states or {}))
+        # bumped by every change; changes that a delta cannot describe also
+        # move _snapshot_version, so diff_since falls back to a full state
+        self.version = 0
+        self._snapshot_version = 0
+        self._replace_guesses([] if all_guesses is None else all_guesses)
+        self._winners = self._owner.own(list(winners or []))
+        self._game_started = False if game_started is None else game_started
+        # player name (None for everyone) -> (guess list, guesses applied, set)
+        self._candidate_cache: dict[
+            str | None, tuple[list[PlayerGuess], int, CandidateSet]
+        ] = {}
+        # (secret_code, code_length, num_of_colors, secret digits, histogram)
+        self._secret_cache: tuple[str, int, int, tuple[int, ...], list[int]] | None = (
+            None
+        )
+        # (cache key, value) for to_dict and to_json, see _cache_key
+        self._dict_cache: tuple[tuple, dict] | None = None
+        self._json_cache: tuple[tuple, str] | None = None
 
         if not self.config.secret_code:
             self.config.secret_code = self.config.generate_secret_code()
 
+    def __getstate__(self) -> dict:
+        # the owner refers to this state, so a copy builds its own, and the
+        # caches are rebuilt on first use rather than shared with the copy
+        state = self.__dict__.copy()
+        del state["_owner"]
+        state.pop("_packed_guesses", None)
+        state.pop("_packed_names", None)
+        state.update(
+            _guess_versions=array("Q", self._guess_versions),
+            _guess_dicts=[],
+            _guess_json=[],
+            _packed_key=None,
+            _packed_count=0,
+            _guess_counts=None,
+            _candidate_cache={},
+            _dict_cache=None,
+            _json_cache=None,
+        )
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._owner = _Owner(self)
+        self._players = self._owner.own(self._players)
+        self._player_states = self._owner.own(dict(self._player_states))
+        self._winners = self._owner.own(list(self._winners))
+        self._all_guesses = self._owner.history.own(self._all_guesses)
+        if isinstance(self._all_guesses, GuessLog):
+            self._all_guesses.use_players(self._players)
+
+    @property
+    def players(self) -> PlayerTable:
+        return self._players
+
+    @players.setter
+    def players(self, players: Iterable[str]) -> None:
+        # the table is kept, so player ids in the guess log stay valid
+        players = list(players)
+        with self._owner:
+            self._players.clear()
+            self._players.extend(players)
+        self._owner.changed()
+
+    @property
+    def player_states(self) -> dict[str, PlayerState]:
+        return self._player_states
+
+    @player_states.setter
+    def player_states(self, player_states: dict[str, PlayerState]) -> None:
+        self._player_states = self._owner.own(dict(player_states))
+        self._owner.changed()
+
+    @property
+    def winners(self) -> list[str]:
+        return self._winners
+
+    @winners.setter
+    def winners(self, winners: Iterable[str]) -> None:
+        self._winners = self._owner.own(list(winners))
+        self._owner.changed()
+
+    @property
+    def mode(self) -> GameMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: GameMode) -> None:
+        self._mode = mode
+        self._bump(snapshot=True)
+
+    @property
+    def game_started(self) -> bool:
+        return self._game_started
+
+    @game_started.setter
+    def game_started(self, game_started: bool) -> None:
+        self._game_started = game_started
+        self._bump()
+
+    @property
+    def all_guesses(self) -> MutableSequence[PlayerGuess]:
+        return self._all_guesses
+
+    @all_guesses.setter
+    def all_guesses(self, guesses: MutableSequence[PlayerGuess]) -> None:
+        self._replace_guesses(guesses)
+        self._bump(snapshot=True)
+
+    def _replace_guesses(self, guesses: MutableSequence[PlayerGuess]) -> None:
+        # a list is copied into one owned by the state; a GuessLog or
+        # LazyGuessList is taken over as it is. A GuessLog's records refer to
+        # players by their id in the state's player table.
+        guesses = self._owner.history.own(guesses)
+        if isinstance(guesses, GuessLog):
+            guesses.use_players(self._players)
+        self._all_guesses = guesses
+        self._reset_guess_caches()
+
+    def _reset_guess_caches(self) -> None:
+        # the status counters are recounted on first use; submit_guess then
+        # keeps them up to date one guess at a time
+        guesses = self._all_guesses
+        # version at which each guess submitted since the reset was
+        # submitted
+        self._base_guess_count = len(guesses)
+        self._guess_versions = array("Q")
+        self._guess_dicts: list[dict] = []
+        self._guess_json: list[str] = []
+        self._packed_key: tuple[int, int] | None = None
+        self._packed_count = 0
+        self._guess_counts: Counter[str] | None = None
+        self._players_at_limit = 0
+        self._won: bool | None = None
+        # (num_of_guesses, code_length) the counters are kept for
+        self._counted_for = (self.config.num_of_guesses, self.config.code_length)
+
+    def _check_counters(self) -> None:
+        # the counters depend on these config fields, so changing either
+        # has them recounted
+        config = self.config
+        key = (config.num_of_guesses, config.code_length)
+        if self._counted_for != key:
+            self._counted_for = key
+            self._guess_counts = None
+            self._won = None
+
+    def _counters(self) -> Counter[str]:
+        self._check_counters()
+        if self._guess_counts is None:
+            guesses = self._all_guesses
+            code_length = self.config.code_length
+            if isinstance(guesses, GuessLog):
+                counts = guesses.counts_by_player()
+                won = code_length in guesses.bulls
+            else:
+                if isinstance(guesses, LazyGuessList):
+                    fields = guesses.players_and_bulls()
+                else:
+                    fields = ((entry.player, entry.bulls) for entry in guesses)
+                counts = Counter()
+                won = False
+                for player, bulls in fields:
+                    counts[player] += 1
+                    won = won or bulls == code_length
+            self._guess_counts = counts
+            self._players_at_limit = sum(
+                count == self.config.num_of_guesses for count in counts.values()
+            )
+            if self._won is None:
+                self._won = won
+        return self._guess_counts
+
+    def _count(self, player: str) -> None:
+        count = self._guess_counts[player] + 1
+        self._guess_counts[player] = count
+        # players with exactly num_of_guesses guesses; going past the limit
+        # takes a player back out
+        if count == self.config.num_of_guesses:
+            self._players_at_limit += 1
+        elif count == self.config.num_of_guesses + 1:
+            self._players_at_limit -= 1
+
+    def _count_guess(self, player: str, bulls: int) -> None:
+        # counters that have not been built yet will see the guess when they
+        # are
+        if self._guess_counts is not None:
+            self._count(player)
+        if bulls == self.config.code_length:
+            self._won = True
+
+    def _bump(self, *, snapshot: bool = False) -> None:
+        self.version += 1
+        if snapshot:
+            self._snapshot_version = self.version
+
+    def mark_dirty(self) -> None:
+        # everything cached is rebuilt and clients get a full state next.
+        # Called for in-place changes to the guess history; call it directly
+        # only after changing something the state cannot see, such as a guess
+        # list given to it that it did not copy.
+        self._reset_guess_caches()
+        self._candidate_cache.clear()
+        self._bump(snapshot=True)
+
+    def _cache_key(self) -> tuple:
+        # the version covers every mutating method and property; the config
+        # fields that callers commonly assign are checked directly
+        config = self.config
+        return (
+            self.version,
+            config.code_length,
+            config.num_of_colors,
+            config.num_of_guesses,
+            config.secret_code,
+            config.game_type,
+        )
+
+    def _serialized_guesses(self) -> list[dict]:
+        # PlayerGuess.to_dict of every guess; only guesses added since the
+        # last call are serialized
+        cache = self._guess_dicts
+        guesses = self._all_guesses
+        if len(cache) > len(guesses):
+            cache.clear()
+        cache += _to_dicts(guesses, len(cache))
+        return cache
+
+    def _serialized_guesses_since(self, start: int) -> list[dict]:
+        # the same from start on; past what has been cached so far (after a
+        # lazy load, say) only these guesses are serialized, and not cached
+        if start > len(self._guess_dicts):
+            return _to_dicts(self._all_guesses, start)
+        return self._serialized_guesses()[start:]
+
+    def _serialized_guess_json(self) -> list[str]:
+        # the same, encoded as JSON
+        guesses = self._serialized_guesses()
+        cache = self._guess_json
+        if len(cache) > len(guesses):
+            cache.clear()
+        for entry in guesses[len(cache) :]:
+            cache.append(codec.dumps(entry))
+        return cache
+
+    def _parsed_secret(self) -> tuple[tuple[int, ...], list[int]]:
+        # the secret parsed once; keyed on the config fields it depends on so
+        # replacing the secret or the configuration re-parses it
+        config = self.config
+        cached = self._secret_cache
+        if cached is None or cached[:3] != (
+            config.secret_code,
+            config.code_length,
+            config.num_of_colors,
+        ):
+            secret = tuple(
+                validate_code_input(
+                    config.secret_code, config.code_length, config.num_of_colors
+                )
+            )
+            cached = self._secret_cache = (
+                config.secret_code,
+                config.code_length,
+                config.num_of_colors,
+                secret,
+                color_histogram(secret, config.num_of_colors),
+            )
+        return cached[3], cached[4]
+
+    def guess_count(self, player_name: str) -> int:
+        return self._counters()[player_name]
+
     @property
     def game_over(self):
         if self.mode == GameMode.SINGLE_BOARD:
-            return len(self.all_guesses) >= self.config.num_of_guesses or any(
-                g.bulls == self.config.code_length for g in self.all_guesses
-            )
+            return len(self._all_guesses) >= self.config.num_of_guesses or self.game_won
         else:
-            if not self.all_guesses:
+            counts = self._counters()
+            if not counts:
                 return False
             else:
-                player_guess_counts = Counter(g.player for g in self.all_guesses)
-                return all(
-                    gc == self.config.num_of_guesses
-                    for gc in player_guess_counts.values()
-                )
+                return self._players_at_limit == len(counts)
         # TODO
         # else:
         #     if not self.player_states:
@@ -184,7 +1361,10 @@ class GameState:
 
     @property
     def game_won(self):
-        return any(g.bulls == self.config.code_length for g in self.all_guesses)
+        self._check_counters()
+        if self._won is None:
+            self._counters()
+        return self._won
 
         # TODO
         # if self.mode == GameMode.SINGLE_BOARD:
@@ -200,12 +1380,50 @@ class GameState:
     def remaining_guesses(self):
         return self.config.num_of_guesses - self.current_row
 
+    def remaining_candidates(self, player_name: str | None = None) -> CandidateSet:
+        # codes consistent with every guess so far, or only with player_name's
+        # guesses; only guesses made since the last call are applied
+        cached = self._candidate_cache.get(player_name)
+        if (
+            cached is None
+            or cached[0] is not self.all_guesses
+            or cached[1] > len(self.all_guesses)
+        ):
+            cached = (
+                self.all_guesses,
+                0,
+                CandidateSet.full(self.config.code_length, self.config.num_of_colors),
+            )
+
+        guesses, applied, candidates = cached
+        for guess, bulls, cows in _history(guesses, applied, player_name):
+            candidates.apply(guess, bulls, cows)
+        self._candidate_cache[player_name] = (guesses, len(guesses), candidates)
+        return candidates.copy()
+
+    def hint(
+        self, advisor: Solver | DecisionTree, player_name: str | None = None
+    ) -> str | None:
+        # next guess suggested by a solver or a compiled decision tree for the
+        # shared history, or for player_name's own guesses only
+        history = _history(self.all_guesses, player=player_name)
+        if isinstance(advisor, Solver):
+            guess = advisor.next_guess(
+                history, self.remaining_candidates(player_name).ranks()
+            )
+        else:
+            guess = advisor.next_guess(history)
+        return None if guess is None else str(guess)
+
     def add_player(self, player_name: str) -> None:
         if player_name not in self.players:
-            self.players.append(player_name)
-            self.player_states[player_name] = PlayerState(
-                name=player_name, remaining_guesses=self.config.num_of_guesses
-            )
+            # a change a delta can describe, so not a snapshot
+            with self._owner:
+                self.players.append(player_name)
+                self.player_states[player_name] = PlayerState(
+                    name=player_name, remaining_guesses=self.config.num_of_guesses
+                )
+            self._bump()
             # if (
             #     self.mode == GameMode.MULTI_BOARD
             #     and player_name not in self.player_states
@@ -216,19 +1434,26 @@ class GameState:
 
     def remove_player(self, player_name: str) -> None:
         if player_name in self.players:
-            self.players.remove(player_name)
+            with self._owner:
+                self.players.remove(player_name)
+            self._bump()
 
     def reset(self) -> None:
         self.config.secret_code = self.config.generate_secret_code()
-        self.all_guesses = []
-        self.player_states = {}
-        self.winners = []
-        self.game_started = False
-
-        for player_name in self.players:
-            self.player_states[player_name] = PlayerState(
-                name=player_name, remaining_guesses=self.config.num_of_guesses
+        self._secret_cache = None
+        with self._owner:
+            self._replace_guesses(
+                GuessLog() if isinstance(self._all_guesses, GuessLog) else []
             )
+            self.player_states = {}
+            self.winners = []
+            self._game_started = False
+
+            for player_name in self.players:
+                self.player_states[player_name] = PlayerState(
+                    name=player_name, remaining_guesses=self.config.num_of_guesses
+                )
+        self._bump(snapshot=True)
         # if self.mode == GameMode.MULTI_BOARD:
         #     for player_name in self.players:
         #         self.player_states[player_name] = PlayerState(
@@ -301,7 +1526,7 @@ class GameState:
 
                     all_guesses.append(
                         PlayerGuess(
-                            guess="".join(map(str, row.guess)),
+                            guess=str(row.guess),
                             bulls=row.bulls,
                             cows=row.cows,
                             player=player_name,
@@ -315,7 +1540,7 @@ class GameState:
                 for row in board.board:
                     if row.is_filled:
                         guess_entry = PlayerGuess(
-                            guess="".join(map(str, row.guess)),
+                            guess=str(row.guess),
                             bulls=row.bulls,
                             cows=row.cows,
                             player=player.name,
@@ -359,7 +1584,11 @@ class GameState:
             game_started=True,
         )
 
-    def submit_guess(self, player_name: str, guess: str) -> dict:
+    def submit_guess(
+        self, player_name: str, guess: str, *, delta: bool = False
+    ) -> dict:
+        # with delta=True a successful guess returns diff_since(<version
+        # before the guess>) instead of the full state
         if self.game_over and self.config.game_type != 2:
             return {"error": "Game is already over"}
 
@@ -367,74 +1596,331 @@ class GameState:
             guess_digits = validate_code_input(
                 guess, self.config.code_length, self.config.num_of_colors
             )
-            bulls, cows = calculate_bulls_and_cows(
-                validate_code_input(
-                    self.config.secret_code,
-                    self.config.code_length,
-                    self.config.num_of_colors,
-                ),
-                guess_digits,  # TODO: change to self.validate_secret_code() and/or optimize
-            )
-
-            guess_entry = PlayerGuess(
-                guess=guess, bulls=bulls, cows=cows, player=player_name
-            )
-            self.all_guesses.append(guess_entry)
-
-            if bulls == self.config.code_length:
-                self._game_won = True
-                self._game_over = True
-                self.winners.append(player_name)
+            secret, histogram = self._parsed_secret()
+            bulls, cows = calculate_bulls_and_cows(secret, guess_digits, histogram)
+
+            since = self.version
+            self._bump()
+            with self._owner:
+                if isinstance(self._all_guesses, GuessLog):
+                    self._all_guesses.record(guess, bulls, cows, player_name)
+                else:
+                    self._all_guesses.append(
+                        PlayerGuess(
+                            guess=guess, bulls=bulls, cows=cows, player=player_name
+                        )
+                    )
+                if bulls == self.config.code_length:
+                    self.winners.append(player_name)
+            self._guess_versions.append(self.version)
+            self._count_guess(player_name, bulls)
+            if delta:
+                return self.diff_since(since)
             return self.to_dict()
 
         except ValueError as e:
             return {"error": str(e)}
 
     def to_json(self) -> str:
-        return jsonpickle.dumps(self.to_dict())
+        key = self._cache_key()
+        if self._json_cache is None or self._json_cache[0] != key:
+            # already encoded guesses are spliced in rather than re-encoded
+            data = self.to_dict()
+            data["guesses"] = codec.encode_array(self._serialized_guess_json())
+            self._json_cache = (
+                key,
+                _STATE_LAYOUT.join(
+                    data[name] if name == "guesses" else codec.dumps(data[name])
+                    for name in _STATE_LAYOUT.keys
+                ),
+            )
+        return self._json_cache[1]
+
+    @classmethod
+    def from_json(
+        cls, json_str: str, config: GameConfig | None = None, *, lazy: bool = False
+    ) -> GameState:
+        data = codec.loads(json_str)
+        return cls.from_dict(data, config, lazy=lazy)
+
+    def _packed_guess_records(self) -> tuple[bytearray, dict[str, int]]:
+        # every guess packed as a snapshot record, with player names interned
+        # in order of first appearance; only guesses added since the last call
+        # are packed
+        config = self.config
+        key = (config.code_length, config.num_of_colors)
+        if self._packed_key != key or self._packed_count > len(self._all_guesses):
+            self._packed_key = key
+            self._packed_guesses = bytearray()
+            self._packed_names = {}
+            self._packed_count = 0
+        packed, names = self._packed_guesses, self._packed_names
+        packed += _pack_guess_records(
+            self._all_guesses,
+            self._packed_count,
+            *key,
+            lambda name: names.setdefault(name, len(names)),
+        )
+        self._packed_count = len(self._all_guesses)
+        return packed, names
+
+    def to_bytes(self) -> bytes:
+        config = self.config
+        code_length, num_of_colors = config.code_length, config.num_of_colors
+        # the header stores these in fixed-width fields, see _SNAPSHOT_HEADER
+        for name, value, limit in (
+            ("game_type", config.game_type, 0xFF),
+            ("code_length", code_length, 0xFF),
+            ("num_of_colors", num_of_colors, 0xFF),
+            ("num_of_guesses", config.num_of_guesses, 0xFFFF),
+            ("version", self.version, 0xFFFF_FFFF_FFFF_FFFF),
+        ):
+            if not 0 <= value <= limit:
+                raise ValueError(
+                    f"{name} {value} does not fit in a snapshot, "
+                    f"must be between 0 and {limit}"
+                )
+        rank = _guess_record(code_length, num_of_colors)[0]
+        packed_guesses, guess_names = self._packed_guess_records()
+        names = dict(guess_names)
+
+        def intern(name: str) -> int:
+            return names.setdefault(name, len(names))
+
+        def pack_names(body: bytearray, values: list[str]) -> None:
+            body += _U32.pack(len(values))
+            for name in values:
+                body += _U32.pack(intern(name))
+
+        secret = Code.from_digits(self._parsed_secret()[0], num_of_colors)
+        body = bytearray(rank.pack(secret.rank))
+        pack_names(body, self.players)
+        pack_names(body, self.winners)
+        body += _U32.pack(len(self._all_guesses))
+        body += packed_guesses
+        body += _U32.pack(len(self.player_states))
+        for name, player_state in self.player_states.items():
+            body += _PLAYER_STATE_RECORD.pack(
+                intern(name),
+                player_state.current_row,
+                player_state.remaining_guesses,
+                player_state.game_over,
+                player_state.game_won,
+            )
+            body += _U32.pack(len(player_state.guesses))
+            body += _pack_guess_records(
+                player_state.guesses, 0, code_length, num_of_colors, intern
+            )
+
+        out = bytearray(
+            _SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC,
+                SNAPSHOT_FORMAT_VERSION,
+                _MODES.index(self.mode),
+                self.game_started,
+                config.game_type,
+                code_length,
+                num_of_colors,
+                config.num_of_guesses,
+                self.version,
+            )
+        )
+        out += _U32.pack(len(names))
+        for name in names:
+            encoded = name.encode()
+            out += _U32.pack(len(encoded))
+            out += encoded
+        out += body
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes | bytearray | memoryview, *, columnar: bool = False
+    ) -> GameState:
+        # with columnar=True guesses are loaded into GuessLogs straight from
+        # the snapshot's records, without building PlayerGuess objects
+        try:
+            return cls._from_snapshot(memoryview(data), columnar=columnar)
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"Truncated or corrupt game state snapshot: {e}") from e
 
     @classmethod
-    def from_json(cls, json_str: str, config: GameConfig | None = None) -> GameState:
-        data = jsonpickle.loads(json_str)
-        return cls.from_dict(data, config)
+    def _from_snapshot(cls, view: memoryview, *, columnar: bool) -> GameState:
+        # decodes straight from the buffer: fixed-size fields with struct and
+        # guess records as numpy views
+        (
+            magic,
+            format_version,
+            mode,
+            game_started,
+            game_type,
+            code_length,
+            num_of_colors,
+            num_of_guesses,
+            version,
+        ) = _SNAPSHOT_HEADER.unpack_from(view)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("Not a game state snapshot")
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {format_version}")
+        offset = _SNAPSHOT_HEADER.size
+
+        def read_u32() -> int:
+            nonlocal offset
+            (value,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            return value
+
+        def take(size: int) -> memoryview:
+            nonlocal offset
+            if offset + size > len(view):
+                raise ValueError("Truncated or corrupt game state snapshot")
+            offset += size
+            return view[offset - size : offset]
+
+        names = [str(take(read_u32()), "utf-8") for _ in range(read_u32())]
+        rank, _, dtype = _guess_record(code_length, num_of_colors)
+
+        def read_names() -> list[str]:
+            return [names[read_u32()] for _ in range(read_u32())]
+
+        def code_strings(ranks: np.ndarray) -> list[str]:
+            digits = decode_codes(ranks, code_length, num_of_colors)
+            return (
+                (digits + ord("0"))
+                .view(f"S{code_length}")
+                .ravel()
+                .astype(f"U{code_length}")
+                .tolist()
+            )
 
-    def to_dict(self):
+        def read_guesses() -> list[PlayerGuess] | GuessLog:
+            count = read_u32()
+            if not count:
+                return GuessLog() if columnar else []
+            records = np.frombuffer(take(count * dtype.itemsize), dtype=dtype)
+            if columnar:
+                if records["player"].max() >= len(names):
+                    raise ValueError("Truncated or corrupt game state snapshot")
+                ranks, code_id = np.unique(records["rank"], return_inverse=True)
+                return GuessLog.from_columns(
+                    code_strings(ranks),
+                    names,
+                    code_id,
+                    records["player"],
+                    records["bulls"],
+                    records["cows"],
+                    records["micros"],
+                )
+            guesses = code_strings(records["rank"])
+            return [
+                PlayerGuess(
+                    guess=guess,
+                    bulls=bulls,
+                    cows=cows,
+                    player=names[player],
+                    timestamp_us=micros,
+                )
+                for guess, bulls, cows, player, micros in zip(
+                    guesses,
+                    records["bulls"].tolist(),
+                    records["cows"].tolist(),
+                    records["player"].tolist(),
+                    records["micros"].tolist(),
+                    strict=True,
+                )
+            ]
+
+        (secret,) = rank.unpack(take(rank.size))
+        players = read_names()
+        winners = read_names()
+        all_guesses = read_guesses()
+        player_states = {}
+        for _ in range(read_u32()):
+            name, current_row, remaining_guesses, game_over, game_won = (
+                _PLAYER_STATE_RECORD.unpack(take(_PLAYER_STATE_RECORD.size))
+            )
+            player_states[names[name]] = PlayerState(
+                name=names[name],
+                guesses=read_guesses(),
+                current_row=current_row,
+                game_over=bool(game_over),
+                game_won=bool(game_won),
+                remaining_guesses=remaining_guesses,
+            )
+
+        state = cls(
+            GameConfig(
+                code_length=code_length,
+                num_of_colors=num_of_colors,
+                num_of_guesses=num_of_guesses,
+                secret_code=str(Code.unrank(secret, code_length, num_of_colors)),
+                game_type=game_type,
+            ),
+            mode=_MODES[mode],
+            players=players,
+            player_states=player_states,
+            all_guesses=all_guesses,
+            winners=winners,
+            game_started=bool(game_started),
+        )
+        state.version = state._snapshot_version = version
+        return state
+
+    def _status_dict(self) -> dict:
         if self.config.game_type == 2:
-            return {
-                "config": self.config.to_dict(),
-                "mode": self.mode.value,
-                "players": self.players,
-                "guesses": [g.to_dict() for g in self.all_guesses],
-                "game_over": False,  # TODO:
-                "game_won": self.game_won,
-                "winners": self.winners,
-                "game_started": self.game_started,
-                "current_row": self.current_row,
-                "remaining_guesses": 100,  # TODO
-                "secret_code": self.config.secret_code if self.game_over else None,
-                "players_data": {
-                    name: state.to_dict() for name, state in self.player_states.items()
-                },
-            }
+            game_over = False  # TODO:
+            remaining_guesses = 100  # TODO
         else:
-            base_dict = {
-                "config": self.config.to_dict(),
-                "mode": self.mode.value,
-                "players": self.players,
-                "guesses": [g.to_dict() for g in self.all_guesses],
-                "game_over": self.game_over,
-                "game_won": self.game_won,
-                "winners": self.winners,
-                "game_started": self.game_started,
-                "current_row": self.current_row,
-                "remaining_guesses": self.remaining_guesses,
-                "secret_code": self.config.secret_code if self.game_over else None,
-                "players_data": {
-                    name: state.to_dict() for name, state in self.player_states.items()
-                },
-            }
+            game_over = self.game_over
+            remaining_guesses = self.remaining_guesses
+        return {
+            "game_over": game_over,
+            "game_won": self.game_won,
+            "winners": list(self.winners),
+            "game_started": self.game_started,
+            "current_row": self.current_row,
+            "remaining_guesses": remaining_guesses,
+            "secret_code": self.config.secret_code if self.game_over else None,
+        }
 
-        return base_dict
+    def to_dict(self):
+        # rebuilt only when the state has changed; the nested lists and dicts
+        # are shared between calls and must not be modified
+        key = self._cache_key()
+        if self._dict_cache is None or self._dict_cache[0] != key:
+            self._dict_cache = (
+                key,
+                {
+                    "config": self.config.to_dict(),
+                    "mode": self.mode.value,
+                    "players": list(self.players),
+                    "guesses": list(self._serialized_guesses()),
+                    **self._status_dict(),
+                    "players_data": {
+                        name: state.to_dict()
+                        for name, state in self.player_states.items()
+                    },
+                    "version": self.version,
+                },
+            )
+        return dict(self._dict_cache[1])
+
+    def diff_since(self, version: int) -> dict:
+        # what changed after version: the guesses submitted since then plus
+        # the current status fields. A client too far behind (or claiming a
+        # future version) gets the full state, marked with "full": True.
+        if not self._snapshot_version <= version <= self.version:
+            return {"full": True, **self.to_dict()}
+        start = self._base_guess_count + bisect_right(self._guess_versions, version)
+        return {
+            "full": False,
+            "since": version,
+            "version": self.version,
+            "players": list(self.players),
+            "guesses": self._serialized_guesses_since(start),
+            **self._status_dict(),
+        }
 
     # def to_dict(self):
     #     base_dict = {
@@ -459,7 +1945,12 @@ class GameState:
     #     return base_dict
 
     @classmethod
-    def from_dict(cls, data: dict, config: GameConfig | None = None) -> GameState:
+    def from_dict(
+        cls, data: dict, config: GameConfig | None = None, *, lazy: bool = False
+    ) -> GameState:
+        # with lazy=True guess lists are LazyGuessList views over data's own
+        # guess dicts, and game_won is taken from data, so loading does not
+        # depend on the length of the history
         mode = GameMode.SINGLE_BOARD
         if config:
             game_type = data.get("game_type", config.game_type)
@@ -467,16 +1958,19 @@ class GameState:
                 mode = GameMode.MULTI_BOARD
 
         players = data.get("players", [])
-        all_guesses = [PlayerGuess.from_dict(g) for g in data.get("guesses", [])]
+        if lazy:
+            all_guesses = LazyGuessList(data.get("guesses", []))
+        else:
+            all_guesses = [PlayerGuess.from_dict(g) for g in data.get("guesses", [])]
         winners = data.get("winners", [])
         game_started = data.get("game_started", False)
 
         player_states = {}
         if "players_data" in data:
             for name, player_data in data["players_data"].items():
-                player_states[name] = PlayerState.from_dict(player_data)
+                player_states[name] = PlayerState.from_dict(player_data, lazy=lazy)
 
-        return cls(
+        state = cls(
             config=config,
             mode=mode,
             players=players,
@@ -485,3 +1979,8 @@ class GameState:
             winners=winners,
             game_started=game_started,
         )
+        # continue the version sequence clients have already seen
+        state.version = state._snapshot_version = data.get("version", 0)
+        if lazy and "game_won" in data:
+            state._won = bool(data["game_won"])
+        return state
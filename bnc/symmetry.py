@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import permutations
+
+import numpy as np
+
+from .code import Code
+
+
+@dataclass(frozen=True)
+class Symmetry:
+    # symmetries of the code space that every guess so far is invariant under.
+    # Positions in the same block held the same digit in every guess, and free
+    # colors never appeared in any guess, so swapping either leaves all past
+    # feedback unchanged and the guesses they relate score identically.
+    code_length: int
+    num_of_colors: int
+    position_blocks: tuple[tuple[int, ...], ...]
+    free_colors: tuple[int, ...]
+
+    @classmethod
+    def from_guesses(
+        cls, guesses: Iterable[Code], code_length: int, num_of_colors: int
+    ) -> Symmetry:
+        columns: dict[tuple[int, ...], list[int]] = {}
+        used_colors: set[int] = set()
+        digits = [guess.digits for guess in guesses]
+        for position in range(code_length):
+            column = tuple(guess[position] for guess in digits)
+            columns.setdefault(column, []).append(position)
+            used_colors.update(column)
+
+        return cls(
+            code_length=code_length,
+            num_of_colors=num_of_colors,
+            position_blocks=tuple(tuple(block) for block in columns.values()),
+            free_colors=tuple(
+                color
+                for color in range(1, num_of_colors + 1)
+                if color not in used_colors
+            ),
+        )
+
+    def _block_of(self) -> list[int]:
+        block_of = [0] * self.code_length
+        for index, block in enumerate(self.position_blocks):
+            for position in block:
+                block_of[position] = index
+        return block_of
+
+    def canonical(self, code: Code) -> Code:
+        # lexicographically smallest code in the orbit of code; sorting each
+        # block is optimal for a fixed relabelling, so only relabellings of the
+        # free colors that actually occur need to be tried
+        digits = code.digits
+        free = set(self.free_colors)
+        present = sorted({digit for digit in digits if digit in free})
+        targets = self.free_colors[: len(present)]
+
+        best = None
+        for order in permutations(targets):
+            mapping = dict(zip(present, order, strict=True))
+            relabelled = [mapping.get(digit, digit) for digit in digits]
+            for block in self.position_blocks:
+                for position, digit in zip(
+                    block, sorted(relabelled[p] for p in block), strict=True
+                ):
+                    relabelled[position] = digit
+            if best is None or relabelled < best:
+                best = relabelled
+        return Code.from_digits(best, self.num_of_colors)
+
+    def representatives(self, limit: int | None = None) -> np.ndarray | None:
+        # ranks, in increasing order, of a set of guesses containing the
+        # canonical form of every orbit: digits never decrease within a block
+        # and free colors are introduced in increasing order. Returns None as
+        # soon as there are more than limit of them.
+        code_length = self.code_length
+        num_of_colors = self.num_of_colors
+        block_of = self._block_of()
+        free_colors = self.free_colors
+        free_index = {color: i for i, color in enumerate(free_colors)}
+
+        ranks: list[int] = []
+        last_in_block = [0] * len(self.position_blocks)
+
+        def extend(position: int, rank: int, next_free: int) -> bool:
+            if position == code_length:
+                ranks.append(rank)
+                return limit is None or len(ranks) <= limit
+            block = block_of[position]
+            previous = last_in_block[block]
+            for digit in range(max(previous, 1), num_of_colors + 1):
+                index = free_index.get(digit)
+                if index is not None and index > next_free:
+                    continue
+                last_in_block[block] = digit
+                if not extend(
+                    position + 1,
+                    rank * num_of_colors + digit - 1,
+                    next_free + (index == next_free),
+                ):
+                    return False
+            last_in_block[block] = previous
+            return True
+
+        if not extend(0, 0, 0):
+            return None
+        return np.array(ranks, dtype=np.int64)
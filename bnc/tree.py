@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .code import Code
+from .feedback import default_cache_dir, encode_feedback
+from .solver import STRATEGIES, History, Solver
+
+logger = logging.getLogger(__name__)
+
+
+class DecisionTree:
+    # a whole strategy as a flat int32 table with one row per position.
+    # Column 0 is the guess rank and column 1 + f is the row reached after
+    # feedback f, or 0 when that reply is impossible (or wins). Row 0 is a
+    # header holding code_length, num_of_colors, the worst-case number of
+    # guesses and the total number of guesses over all secrets; the root is
+    # row 1.
+    def __init__(self, table: np.ndarray) -> None:
+        self._table = table
+        self.code_length = int(table[0, 0])
+        self.num_of_colors = int(table[0, 1])
+        self.worst_case = int(table[0, 2])
+        self.total_guesses = int(table[0, 3])
+
+    @classmethod
+    def compile(cls, solver: Solver) -> DecisionTree:
+        code_length = solver.code_length
+        win = encode_feedback(code_length, 0, code_length)
+        rows: list[list[int]] = [[0] * (solver.num_of_feedbacks + 1)]
+        worst_case = 0
+        total_guesses = 0
+
+        def visit(history: list, candidates: np.ndarray) -> int:
+            nonlocal worst_case, total_guesses
+            depth = len(history) + 1
+            guess = solver.next_guess(history, candidates)
+            row = [0] * (solver.num_of_feedbacks + 1)
+            row[0] = guess.rank
+            index = len(rows)
+            rows.append(row)
+
+            feedback = solver.feedback(guess.rank, candidates)[0]
+            for value in np.unique(feedback).tolist():
+                if value == win:
+                    worst_case = max(worst_case, depth)
+                    total_guesses += depth
+                    continue
+                bulls, cows = divmod(value, code_length + 1)
+                row[value + 1] = visit(
+                    [*history, (guess, bulls, cows)], candidates[feedback == value]
+                )
+            return index
+
+        visit([], solver.candidates([]))
+        rows[0][:4] = [code_length, solver.num_of_colors, worst_case, total_guesses]
+        logger.info(
+            "Compiled decision tree for %dx%d with %d positions",
+            code_length,
+            solver.num_of_colors,
+            len(rows) - 1,
+        )
+        return cls(np.array(rows, dtype=np.int32))
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, self._table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> DecisionTree:
+        table = np.load(path, mmap_mode="r")
+        if table.ndim != 2 or table.dtype != np.int32 or len(table) < 2:
+            raise ValueError(f"{path} is not a decision tree")
+        return cls(table)
+
+    def __len__(self) -> int:
+        return len(self._table) - 1
+
+    @property
+    def num_of_codes(self) -> int:
+        return self.num_of_colors**self.code_length
+
+    @property
+    def average_guesses(self) -> float:
+        return self.total_guesses / self.num_of_codes
+
+    def next_guess(self, history: History = ()) -> Code | None:
+        # None when the history leaves the tree, e.g. a guess the strategy
+        # would not have played
+        node = 1
+        for guess, bulls, cows in history:
+            if not isinstance(guess, Code):
+                guess = Code.from_str(guess, self.code_length, self.num_of_colors)
+            if guess.rank != self._table[node, 0]:
+                return None
+            node = int(
+                self._table[node, encode_feedback(bulls, cows, self.code_length) + 1]
+            )
+            if node == 0:
+                return None
+        return Code.unrank(
+            int(self._table[node, 0]), self.code_length, self.num_of_colors
+        )
+
+
+def decision_tree_path(
+    strategy: str,
+    code_length: int,
+    num_of_colors: int,
+    cache_dir: Path | str | None = None,
+) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    return cache_dir / f"tree_{strategy}_{code_length}x{num_of_colors}.npy"
+
+
+def load_decision_tree(
+    strategy: str,
+    code_length: int,
+    num_of_colors: int,
+    cache_dir: Path | str | None = None,
+) -> DecisionTree | None:
+    path = decision_tree_path(strategy, code_length, num_of_colors, cache_dir)
+    if not path.exists():
+        return None
+    return DecisionTree.load(path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile a solver decision tree")
+    parser.add_argument("--code-length", type=int, default=4)
+    parser.add_argument("--num-of-colors", type=int, default=6)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="knuth")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args(argv)
+
+    solver = STRATEGIES[args.strategy](args.code_length, args.num_of_colors)
+    tree = DecisionTree.compile(solver)
+    path = decision_tree_path(
+        args.strategy, args.code_length, args.num_of_colors, args.cache_dir
+    )
+    tree.save(path)
+    print(
+        f"Wrote {len(tree)} positions to {path} "
+        f"(worst case {tree.worst_case}, average {tree.average_guesses:.3f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
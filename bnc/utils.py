@@ -1,11 +1,24 @@
+import asyncio
 import logging
 import random
+import threading
+import time
+import weakref
 from collections import Counter
+from collections.abc import Callable, Sequence
 
 import httpx
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+RANDOM_ORG_URL = "https://www.random.org/integers/"
+# random.org serves at most this many integers per request
+RANDOM_ORG_MAX_BATCH = 10_000
+# consecutive failures before a remote is skipped, and for how long
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 30.0
+
 
 def check_color(color: int, num_of_colors: int) -> bool:
     return 0 < color <= num_of_colors
@@ -28,9 +41,20 @@ def validate_code_input(code: str, code_length: int, num_of_colors: int) -> list
     return digits
 
 
+def color_histogram(digits: Sequence[int], num_of_colors: int) -> list[int]:
+    histogram = [0] * (num_of_colors + 1)
+    for digit in digits:
+        histogram[digit] += 1
+    return histogram
+
+
 def calculate_bulls_and_cows(
-    secret_digits: list[int], guess_digits: list[int]
+    secret_digits: Sequence[int],
+    guess_digits: Sequence[int],
+    secret_histogram: Sequence[int] | None = None,
 ) -> tuple[int, int]:
+    # secret_histogram (see color_histogram) lets callers that score many
+    # guesses against one secret count its colors once
     if not secret_digits:
         raise ValueError("Secret code must be set before calculating bulls and cows")
 
@@ -39,18 +63,106 @@ def calculate_bulls_and_cows(
         if secret_digits[i] == guess_digits[i]:
             bulls_count += 1
 
-    secret_counter = Counter(secret_digits)
-    guess_counter = Counter(guess_digits)
-
     total_matches = 0
-    for digit in guess_counter:
-        if digit in secret_counter:
-            total_matches += min(guess_counter[digit], secret_counter[digit])
+    if secret_histogram is not None:
+        remaining = list(secret_histogram)
+        for digit in guess_digits:
+            if remaining[digit]:
+                remaining[digit] -= 1
+                total_matches += 1
+    else:
+        secret_counter = Counter(secret_digits)
+        guess_counter = Counter(guess_digits)
+
+        for digit in guess_counter:
+            if digit in secret_counter:
+                total_matches += min(guess_counter[digit], secret_counter[digit])
 
     cows_count = total_matches - bulls_count
     return bulls_count, cows_count
 
 
+def encode_codes(digits: np.ndarray, num_of_colors: int) -> np.ndarray:
+    digits = np.asarray(digits, dtype=np.int64)
+    code_length = digits.shape[-1]
+    weights = num_of_colors ** np.arange(code_length - 1, -1, -1, dtype=np.int64)
+    return (digits - 1) @ weights
+
+
+def decode_codes(
+    codes: np.ndarray | int, code_length: int, num_of_colors: int
+) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.int64)
+    weights = num_of_colors ** np.arange(code_length - 1, -1, -1, dtype=np.int64)
+    return (codes[..., None] // weights % num_of_colors + 1).astype(np.uint8)
+
+
+def code_space(code_length: int, num_of_colors: int) -> np.ndarray:
+    return decode_codes(
+        np.arange(num_of_colors**code_length, dtype=np.int64),
+        code_length,
+        num_of_colors,
+    )
+
+
+def calculate_bulls_and_cows_batch(
+    secret_digits: np.ndarray,
+    guess_digits: np.ndarray,
+    num_of_colors: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    # secrets and guesses are digit arrays shaped (..., code_length) and are
+    # broadcast against each other, so one guess can be scored against many
+    # secrets (or many guesses against one secret) in a single call
+    secret_digits = np.asarray(secret_digits, dtype=np.uint8)
+    guess_digits = np.asarray(guess_digits, dtype=np.uint8)
+    if secret_digits.size == 0:
+        raise ValueError("Secret code must be set before calculating bulls and cows")
+    if secret_digits.shape[-1] != guess_digits.shape[-1]:
+        raise ValueError(
+            f"Secret and guess lengths differ: "
+            f"{secret_digits.shape[-1]} != {guess_digits.shape[-1]}"
+        )
+
+    if num_of_colors is None:
+        num_of_colors = int(max(secret_digits.max(), guess_digits.max()))
+
+    bulls = np.count_nonzero(secret_digits == guess_digits, axis=-1)
+
+    total_matches = np.zeros_like(bulls)
+    for color in range(1, num_of_colors + 1):
+        guess_count = np.count_nonzero(guess_digits == color, axis=-1)
+        if not guess_count.any():
+            continue
+        secret_count = np.count_nonzero(secret_digits == color, axis=-1)
+        total_matches += np.minimum(secret_count, guess_count)
+
+    return bulls, total_matches - bulls
+
+
+def generate_secrets(
+    n: int,
+    code_length: int,
+    num_of_colors: int,
+    rng: np.random.Generator | int | None = None,
+    *,
+    encoded: bool = False,
+) -> np.ndarray:
+    # n uniformly random codes in one call: uint8 digits shaped
+    # (n, code_length), or int64 code ranks with encoded=True. rng is a
+    # Generator or a seed; None draws fresh OS entropy.
+    if n < 0:
+        raise ValueError(f"n must be non-negative, got {n}")
+    if code_length <= 0:
+        raise ValueError("Length must be a positive integer.")
+    if num_of_colors < 1:
+        raise ValueError(f"num_of_colors must be at least 1, got {num_of_colors}")
+
+    rng = np.random.default_rng(rng)
+    if encoded:
+        return rng.integers(0, num_of_colors**code_length, size=n, dtype=np.int64)
+    return rng.integers(1, num_of_colors + 1, size=(n, code_length), dtype=np.uint8)
+
+
 def generate_guess(code_length: int, number_of_colors: int) -> str:
     code = ""
     for _ in range(code_length):
@@ -58,12 +170,9 @@ def generate_guess(code_length: int, number_of_colors: int) -> str:
     return code
 
 
-async def get_random_number_async(
-    length: int = 4,
-    min_value: int = 1,
-    max_value: int = 7,
-    base: int = 10,
-) -> str:
+def _validate_random_number_args(
+    length: int, min_value: int, max_value: int, base: int
+) -> None:
     if length <= 0:
         raise ValueError("Length must be a positive integer.")
 
@@ -78,9 +187,10 @@ async def get_random_number_async(
     if min_value < 0:
         raise ValueError("min_value cannot be negative for this implementation.")
 
-    numbers: list[int]
-    params = {
-        "num": length,
+
+def _random_org_params(count: int, min_value: int, max_value: int) -> dict:
+    return {
+        "num": count,
         "min": min_value,
         "max": max_value,
         "col": 1,
@@ -89,73 +199,244 @@ async def get_random_number_async(
         "rnd": "new",
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://www.random.org/integers/", params=params, timeout=5.0
-            )
-            response.raise_for_status()
-            numbers_str = response.text.strip().split()
-            if len(numbers_str) != length:
-                raise ValueError(
-                    f"API returned {len(numbers_str)} numbers, expected {length}"
-                )
-            numbers = [int(n) for n in numbers_str]
-        except (httpx.RequestError, httpx.HTTPStatusError, ValueError) as e:
-            # fallback
-            logger.warning(
-                "Failed to get random number from API: %s, falling back to local generation",
-                e,
-            )
-            numbers = [random.randint(min_value, max_value) for _ in range(length)]
 
-        return "".join(map(str, numbers))
+def _parse_random_org_response(response: httpx.Response, count: int) -> list[int]:
+    response.raise_for_status()
+    numbers_str = response.text.strip().split()
+    if len(numbers_str) != count:
+        raise ValueError(f"API returned {len(numbers_str)} numbers, expected {count}")
+    return [int(n) for n in numbers_str]
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # closed: calls go through. After failure_threshold consecutive failures
+    # it opens and allow() refuses calls for cooldown seconds; then a single
+    # trial call is let through, which closes it again on success or reopens
+    # it on failure.
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
 
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
 
-def get_random_number(
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight:
+                return False
+            if self._clock() - self._opened_at < self.cooldown:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        # the call ended without showing whether the remote works (it was
+        # cancelled, or failed on our side), so the next call may try again
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    breaker = _circuit_breakers.get(url)
+    if breaker is None:
+        breaker = _circuit_breakers.setdefault(url, CircuitBreaker())
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    _circuit_breakers.clear()
+
+
+# one keep-alive pool for the process; async clients are tied to the event
+# loop they were created on, so there is one per loop
+_http_client: httpx.Client | None = None
+_async_http_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.Client()
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_http_clients[loop] = httpx.AsyncClient()
+    return client
+
+
+def close_http_clients() -> None:
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+
+
+async def aclose_http_clients() -> None:
+    client = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _check_batch(count: int, breaker: CircuitBreaker, url: str) -> None:
+    if not 0 < count <= RANDOM_ORG_MAX_BATCH:
+        raise ValueError(
+            f"count must be between 1 and {RANDOM_ORG_MAX_BATCH}, got {count}"
+        )
+    if not breaker.allow():
+        raise CircuitOpenError(f"Skipping {url} after repeated failures")
+
+
+def fetch_random_integers(
+    count: int,
+    min_value: int,
+    max_value: int,
+    *,
+    url: str = RANDOM_ORG_URL,
+    timeout: float = 5.0,
+) -> list[int]:
+    # one random.org request for count integers over the shared client;
+    # raises on any failure so callers decide how to fall back
+    breaker = get_circuit_breaker(url)
+    _check_batch(count, breaker, url)
+    try:
+        response = get_http_client().get(
+            url,
+            params=_random_org_params(count, min_value, max_value),
+            timeout=timeout,
+        )
+        numbers = _parse_random_org_response(response, count)
+    except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release_trial()
+        raise
+    breaker.record_success()
+    return numbers
+
+
+async def fetch_random_integers_async(
+    count: int,
+    min_value: int,
+    max_value: int,
+    *,
+    url: str = RANDOM_ORG_URL,
+    timeout: float = 5.0,
+) -> list[int]:
+    breaker = get_circuit_breaker(url)
+    _check_batch(count, breaker, url)
+    try:
+        response = await get_async_http_client().get(
+            url,
+            params=_random_org_params(count, min_value, max_value),
+            timeout=timeout,
+        )
+        numbers = _parse_random_org_response(response, count)
+    except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release_trial()
+        raise
+    breaker.record_success()
+    return numbers
+
+
+# everything fetch_random_integers may raise that warrants a local fallback
+RANDOM_ORG_ERRORS = (
+    httpx.RequestError,
+    httpx.HTTPStatusError,
+    ValueError,
+    CircuitOpenError,
+)
+
+
+async def get_random_number_async(
     length: int = 4,
     min_value: int = 1,
     max_value: int = 7,
     base: int = 10,
+    *,
+    url: str = RANDOM_ORG_URL,
+    timeout: float = 5.0,
 ) -> str:
-    if length <= 0:
-        raise ValueError("Length must be a positive integer.")
+    _validate_random_number_args(length, min_value, max_value, base)
 
-    if min_value >= max_value:
-        raise ValueError(
-            f"min_value ({min_value}) must be less than max_value ({max_value})."
+    numbers: list[int]
+    try:
+        numbers = await fetch_random_integers_async(
+            length, min_value, max_value, url=url, timeout=timeout
+        )
+    except RANDOM_ORG_ERRORS as e:
+        # fallback
+        logger.warning(
+            "Failed to get random number from API: %s, falling back to local generation",
+            e,
         )
+        numbers = [random.randint(min_value, max_value) for _ in range(length)]
 
-    if base not in [2, 8, 10, 16]:
-        raise ValueError("Base value must be 2, 8, 10, or 16.")
+    return "".join(map(str, numbers))
 
-    if min_value < 0:
-        raise ValueError("min_value cannot be negative for this implementation.")
 
-    numbers: list[int]
-    params = {
-        "num": length,
-        "min": min_value,
-        "max": max_value,
-        "col": 1,
-        "base": 10,
-        "format": "plain",
-        "rnd": "new",
-    }
+def get_random_number(
+    length: int = 4,
+    min_value: int = 1,
+    max_value: int = 7,
+    base: int = 10,
+    *,
+    url: str = RANDOM_ORG_URL,
+    timeout: float = 5.0,
+) -> str:
+    _validate_random_number_args(length, min_value, max_value, base)
 
+    numbers: list[int]
     try:
-        response = httpx.get(
-            "https://www.random.org/integers/", params=params, timeout=5.0
+        numbers = fetch_random_integers(
+            length, min_value, max_value, url=url, timeout=timeout
         )
-        response.raise_for_status()
-        numbers_str = response.text.strip().split()
-        if len(numbers_str) != length:
-            raise ValueError(
-                f"API returned {len(numbers_str)} numbers, expected {length}"
-            )
-        numbers = [int(n) for n in numbers_str]
-
-    except (httpx.RequestError, httpx.HTTPStatusError, ValueError) as e:
+    except RANDOM_ORG_ERRORS as e:
         # fallback
         logger.warning(
             "Failed to get random number from API: %s, falling back to local generation",
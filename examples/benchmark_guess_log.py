@@ -0,0 +1,99 @@
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from bnc.state import (
+    GameConfig,
+    GameMode,
+    GameState,
+    GuessLog,
+    PlayerGuess,
+)
+
+PLAYERS = ["Alice", "Bob", "Charlie"]
+GUESSES = ["1122", "3344", "5566", "1356", "2465", "6543", "1243", "4321"]
+
+
+def build_state(num_of_guesses: int, *, columnar: bool) -> GameState:
+    config = GameConfig(secret_code="1234", num_of_guesses=num_of_guesses, game_type=2)
+    state = GameState(
+        config,
+        mode=GameMode.MULTI_BOARD,
+        all_guesses=GuessLog() if columnar else None,
+    )
+    for player in PLAYERS:
+        state.add_player(player)
+    for i in range(num_of_guesses):
+        state.submit_guess(PLAYERS[i % len(PLAYERS)], GUESSES[i % len(GUESSES)])
+    return state
+
+
+def bytes_per_guess(num_of_guesses: int, *, columnar: bool) -> float:
+    # the guess storage alone, without the serialization caches
+    state = build_state(num_of_guesses, columnar=columnar)
+    guesses = state.all_guesses
+    del state
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    if columnar:
+        copy = GuessLog(guesses)
+    else:
+        copy = [
+            PlayerGuess(g.guess, g.bulls, g.cows, g.player, timestamp_us=g.timestamp_us)
+            for g in guesses
+        ]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copy
+    return (after - before) / num_of_guesses
+
+
+def operations(state: GameState) -> list:
+    def recount():
+        state.all_guesses = state.all_guesses
+        return state.game_over, state.game_won
+
+    def serialize():
+        state.all_guesses = state.all_guesses
+        return state.to_dict()
+
+    def pack():
+        state.all_guesses = state.all_guesses
+        return state.to_bytes()
+
+    return [
+        ("status recount", recount),
+        ("to_dict from scratch", serialize),
+        ("to_bytes from scratch", pack),
+    ]
+
+
+def per_call(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare guess list storage")
+    parser.add_argument("--guesses", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'guesses':>8} {'operation':<24} {'list':>10} {'GuessLog':>10}")
+    for num_of_guesses in args.guesses:
+        memory = [bytes_per_guess(num_of_guesses, columnar=c) for c in (False, True)]
+        print(
+            f"{num_of_guesses:>8} {'bytes/guess':<24}"
+            f" {memory[0]:>10.0f} {memory[1]:>10.0f}"
+        )
+        rows = [
+            operations(build_state(num_of_guesses, columnar=c)) for c in (False, True)
+        ]
+        for (name, plain), (_, columnar) in zip(*rows, strict=True):
+            print(
+                f"{num_of_guesses:>8} {name:<24}"
+                f" {per_call(plain, args.number):>10.1f}"
+                f" {per_call(columnar, args.number):>10.1f}"
+            )
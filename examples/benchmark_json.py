@@ -0,0 +1,68 @@
+import argparse
+import json
+import timeit
+
+from bnc import codec
+from bnc.state import GameConfig, GameMode, GameState
+
+try:
+    import jsonpickle
+except ImportError:
+    jsonpickle = None
+
+
+def build_state(num_of_guesses: int) -> GameState:
+    config = GameConfig(
+        code_length=4,
+        num_of_colors=6,
+        num_of_guesses=num_of_guesses,
+        secret_code="1234",
+        game_type=2,
+    )
+    state = GameState(config, mode=GameMode.MULTI_BOARD)
+    for player in ["Alice", "Bob", "Charlie"]:
+        state.add_player(player)
+    for i in range(num_of_guesses):
+        state.submit_guess(["Alice", "Bob", "Charlie"][i % 3], "5566")
+    return state
+
+
+def encoders(state: GameState) -> list:
+    data = state.to_dict()
+    text = state.to_json()
+
+    def guess_then_encode():
+        # what a server does per guess: record it, then serialize
+        state.submit_guess("Alice", "5566")
+        return state.to_json()
+
+    rows = []
+    if jsonpickle is not None:
+        rows.append(("jsonpickle.dumps", lambda: jsonpickle.dumps(data)))
+        rows.append(("jsonpickle.loads", lambda: jsonpickle.loads(text)))
+    rows.append(("json.dumps", lambda: json.dumps(data)))
+    rows.append(("codec.dumps", lambda: codec.dumps(data)))
+    rows.append(("codec.loads", lambda: codec.loads(text)))
+    rows.append(("submit_guess + to_json", guess_then_encode))
+    rows.append(("to_json unchanged", state.to_json))
+    return rows
+
+
+def per_call(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare GameState JSON encoders")
+    parser.add_argument("--guesses", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"codec backend: {codec.BACKEND}")
+    print(f"{'guesses':>8} {'encoder':<28} {'us/call':>10}")
+    for num_of_guesses in args.guesses:
+        state = build_state(num_of_guesses)
+        for name, stmt in encoders(state):
+            print(
+                f"{num_of_guesses:>8} {name:<28} {per_call(stmt, args.number):>10.1f}"
+            )
@@ -0,0 +1,55 @@
+import argparse
+import gc
+import tracemalloc
+
+from bnc import Board
+from bnc.state import GameConfig, GameMode, GameState
+
+PLAYERS = ["Alice", "Bob", "Charlie"]
+GUESSES = ["1122", "3344", "5566", "1356", "2465", "6543", "1243", "4321"]
+
+
+def build_room(num_of_guesses: int) -> GameState:
+    config = GameConfig(secret_code="1234", num_of_guesses=100, game_type=2)
+    state = GameState(config, mode=GameMode.MULTI_BOARD)
+    for player in PLAYERS:
+        state.add_player(player)
+    for i in range(num_of_guesses):
+        # fresh strings, as they would arrive from a request
+        player = "".join(PLAYERS[i % len(PLAYERS)])
+        guess = "".join(GUESSES[i % len(GUESSES)])
+        state.submit_guess(player, guess)
+    return state
+
+
+def build_board(num_of_guesses: int) -> Board:
+    board = Board(secret_code="1234", num_of_guesses=max(1, num_of_guesses))
+    for i in range(num_of_guesses // 2):
+        board.evaluate_guess(i, GUESSES[i % len(GUESSES)])
+    return board
+
+
+def bytes_per_object(factory, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    # a full collection also empties the interpreter's free lists
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure memory per room")
+    parser.add_argument("--guesses", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--rooms", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'guesses':>8} {'bytes/room':>12} {'bytes/board':>12}")
+    for num_of_guesses in args.guesses:
+        room = bytes_per_object(lambda n=num_of_guesses: build_room(n), args.rooms)
+        board = bytes_per_object(lambda n=num_of_guesses: build_board(n), args.rooms)
+        print(f"{num_of_guesses:>8} {room:>12.0f} {board:>12.0f}")
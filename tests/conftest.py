@@ -0,0 +1,19 @@
+import pytest
+
+from bnc.utils import reset_circuit_breakers
+
+
+@pytest.fixture(autouse=True, scope="session")
+def feedback_cache_dir(tmp_path_factory):
+    # keep generated feedback matrices out of the user's cache directory
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("BNC_CACHE_DIR", str(tmp_path_factory.mktemp("bnc_cache")))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    # failures injected by one test must not open the circuit for the next
+    reset_circuit_breakers()
+    yield
+    reset_circuit_breakers()
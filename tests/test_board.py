@@ -2,21 +2,33 @@ import pytest
 
 from bnc import Board
 from bnc.board import BoardRow
+from bnc.code import Code
 
 
 class TestBoardRow:
     def test_winning_row(self):
-        row = BoardRow(guess=[1, 2, 3, 4], bulls=4, cows=0, is_filled=True)
+        row = BoardRow(
+            guess=Code.from_digits([1, 2, 3, 4], 6), bulls=4, cows=0, is_filled=True
+        )
         assert row.is_winning_row is True
 
     def test_non_winning_row(self):
-        row = BoardRow(guess=[1, 2, 3, 4], bulls=2, cows=1, is_filled=True)
+        row = BoardRow(
+            guess=Code.from_digits([1, 2, 3, 4], 6), bulls=2, cows=1, is_filled=True
+        )
         assert row.is_winning_row is False
 
     def test_unfilled_row(self):
-        row = BoardRow(guess=[1, 2, 3, 4], bulls=4, cows=0, is_filled=False)
+        row = BoardRow(
+            guess=Code.from_digits([1, 2, 3, 4], 6), bulls=4, cows=0, is_filled=False
+        )
         assert row.is_winning_row is False
 
+    def test_rows_are_immutable(self):
+        row = BoardRow()
+        with pytest.raises(AttributeError):
+            row.bulls = 1
+
 
 class TestBoardInitialization:
     def test_default_initialization(self):
@@ -26,6 +38,11 @@ class TestBoardInitialization:
         assert board.num_of_guesses == 10
         assert board.secret_code is None
 
+    def test_unfilled_rows_are_shared(self):
+        board = Board(num_of_guesses=5)
+        assert all(row is board.board[0] for row in board.board)
+        assert Board().board[0] is board.board[0]
+
     def test_custom_initialization(self):
         board = Board(code_length=5, num_of_colors=8, num_of_guesses=12)
         assert board.code_length == 5
@@ -184,10 +201,66 @@ class TestBoardMethods:
 
     def test_set_board_row(self):
         board = Board()
-        board.set_board_row(2, 1, [1, 2, 3, 4], 3)
+        board.set_board_row(2, 1, Code.from_digits([1, 2, 3, 4], 6), 3)
 
         row = board.board[3]
         assert row.bulls == 2
         assert row.cows == 1
-        assert row.guess == [1, 2, 3, 4]
+        assert row.guess.digits == (1, 2, 3, 4)
         assert row.is_filled is True
+
+    def test_unfilled_rows_have_no_guess(self):
+        board = Board()
+        assert all(row.guess is None for row in board.board)
+
+    def test_evaluate_guess_with_code(self):
+        board = Board(secret_code="1234")
+        board.evaluate_guess(0, Code.from_str("1243", 4, 6))
+        assert board.board[0].bulls == 2
+        assert board.board[0].cows == 2
+
+    def test_evaluate_guess_with_mismatched_code(self):
+        board = Board(secret_code="1234")
+        with pytest.raises(ValueError, match="does not match"):
+            board.evaluate_guess(0, Code.from_str("12345", 5, 6))
+
+
+class TestBoardCandidates:
+    def test_all_codes_before_guessing(self):
+        board = Board(code_length=3, num_of_colors=5)
+        assert board.candidate_count == 125
+
+    def test_narrowed_after_each_guess(self):
+        board = Board(secret_code="1234")
+        board.evaluate_guess(0, "1122")
+        after_first = board.candidate_count
+        assert 0 < after_first < 1296
+
+        board.evaluate_guess(1, "1344")
+        assert board.candidate_count < after_first
+        for code in board.iter_candidates():
+            assert str(code) != "1122"
+        assert "1234" in {str(code) for code in board.iter_candidates()}
+
+    def test_incremental_matches_recomputed(self):
+        board = Board(secret_code="3456")
+        assert board.candidate_count == 1296
+        for i, guess in enumerate(["1122", "3344", "5566"]):
+            board.evaluate_guess(i, guess)
+
+        fresh = Board(secret_code="3456")
+        for i, guess in enumerate(["1122", "3344", "5566"]):
+            fresh.evaluate_guess(i, guess)
+        assert list(board.iter_candidates()) == list(fresh.iter_candidates())
+
+    def test_solved(self):
+        board = Board(secret_code="1234")
+        board.evaluate_guess(0, "1234")
+        assert [str(code) for code in board.iter_candidates()] == ["1234"]
+
+    def test_overwritten_row(self):
+        board = Board(secret_code="1234")
+        assert board.candidate_count == 1296
+        board.evaluate_guess(0, "5555")
+        board.evaluate_guess(0, "1234")
+        assert board.candidate_count == 1
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from bnc.book import OpeningBook, load_opening_book, main, opening_book_path
+from bnc.solver import KnuthSolver
+
+
+@pytest.fixture(scope="module")
+def book():
+    return OpeningBook.build(KnuthSolver(4, 6), depth=2)
+
+
+class TestOpeningBook:
+    def test_opening_move(self, book):
+        assert str(book.lookup([])) == "1122"
+
+    def test_second_move_matches_solver(self, book):
+        solver = KnuthSolver(4, 6)
+        for bulls, cows in [(0, 0), (1, 1), (0, 2), (2, 0)]:
+            history = [("1122", bulls, cows)]
+            assert book.lookup(history) == solver.next_guess(history)
+
+    def test_positions(self, book):
+        # the opening plus one position per non-winning reply to 1122
+        solver = KnuthSolver(4, 6)
+        feedback = solver.feedback(book.lookup([]).rank, np.arange(1296))[0]
+        replies = set(feedback.tolist()) - {20}
+        assert len(book) == 1 + len(replies)
+
+    def test_off_book(self, book):
+        assert book.lookup([("1234", 0, 0)]) is None
+        assert book.lookup([("1122", 0, 0), ("3345", 0, 0)]) is None
+
+    def test_invalid_depth(self):
+        with pytest.raises(ValueError, match="depth must be at least 1"):
+            OpeningBook.build(KnuthSolver(4, 6), depth=0)
+
+    def test_save_and_load(self, book, tmp_path):
+        path = tmp_path / "book.npy"
+        book.save(path)
+        loaded = OpeningBook.load(path)
+        assert (loaded.code_length, loaded.num_of_colors) == (4, 6)
+        assert isinstance(loaded._table, np.memmap)
+        assert len(loaded) == len(book)
+        assert loaded.lookup([("1122", 1, 0)]) == book.lookup([("1122", 1, 0)])
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.npy"
+        np.save(path, np.zeros(3))
+        with pytest.raises(ValueError, match="not an opening book"):
+            OpeningBook.load(path)
+
+
+class TestSolverWithBook:
+    def test_consults_book_first(self, book):
+        class FailingSolver(KnuthSolver):
+            def select(self, pool, candidates):
+                raise AssertionError("live search should not run")
+
+        solver = FailingSolver(4, 6, book=book)
+        assert str(solver.next_guess()) == "1122"
+        assert solver.next_guess([("1122", 0, 0)]) == book.lookup([("1122", 0, 0)])
+
+    def test_mismatched_book(self, book):
+        with pytest.raises(ValueError, match="does not match"):
+            KnuthSolver(5, 8, book=book)
+
+
+class TestMain:
+    def test_writes_book(self, tmp_path, capsys):
+        main(
+            [
+                "--code-length",
+                "3",
+                "--num-of-colors",
+                "5",
+                "--depth",
+                "2",
+                "--cache-dir",
+                str(tmp_path),
+            ]
+        )
+        assert opening_book_path("knuth", 3, 5, tmp_path).exists()
+        assert "positions" in capsys.readouterr().out
+        book = load_opening_book("knuth", 3, 5, tmp_path)
+        assert book.lookup([]) == KnuthSolver(3, 5).next_guess()
+
+    def test_missing_book(self, tmp_path):
+        assert load_opening_book("knuth", 4, 6, tmp_path) is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from bnc.candidates import CandidateSet
+from bnc.code import Code
+from bnc.feedback import CACHE_DIR_ENV, load_feedback_matrix
+from bnc.solver import KnuthSolver
+
+
+class TestCandidateSetConstruction:
+    def test_full(self):
+        candidates = CandidateSet.full(3, 5)
+        assert len(candidates) == 125
+        assert candidates.ranks().tolist() == list(range(125))
+        assert candidates.nbytes == 16
+
+    def test_empty(self):
+        candidates = CandidateSet(4, 6)
+        assert len(candidates) == 0
+        assert list(candidates) == []
+
+    def test_from_ranks(self):
+        candidates = CandidateSet.from_ranks([0, 63, 64, 1295], 4, 6)
+        assert candidates.ranks().tolist() == [0, 63, 64, 1295]
+        assert 64 in candidates
+        assert 65 not in candidates
+        assert "6666" in candidates
+
+    def test_wrong_word_count(self):
+        with pytest.raises(ValueError, match="uint64 words"):
+            CandidateSet(4, 6, np.zeros(3, dtype=np.uint64))
+
+
+class TestCandidateSetFiltering:
+    def test_apply_matches_solver(self):
+        history = [("1122", 1, 1), ("3345", 0, 2)]
+        candidates = CandidateSet.from_history(history, 4, 6)
+        expected = KnuthSolver(4, 6).candidates(history)
+        assert candidates.ranks().tolist() == expected.tolist()
+
+    def test_apply_never_builds_the_matrix(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+        history = [("1122", 1, 1), ("3345", 0, 2)]
+        candidates = CandidateSet.from_history(history, 4, 6)
+        assert list(tmp_path.iterdir()) == []
+
+        # a matrix already loaded is used, with the same result
+        load_feedback_matrix(4, 6)
+        assert CandidateSet.from_history(history, 4, 6) == candidates
+
+    def test_filter_returns_copy(self):
+        candidates = CandidateSet.full(4, 6)
+        filtered = candidates.filter("1234", 4, 0)
+        assert len(candidates) == 1296
+        assert [str(code) for code in filtered] == ["1234"]
+
+    def test_intersection(self):
+        alice = CandidateSet.full(4, 6).filter("1122", 2, 0)
+        bob = CandidateSet.full(4, 6).filter("3344", 1, 0)
+        both = alice & bob
+        assert both == CandidateSet.from_history([("1122", 2, 0), ("3344", 1, 0)], 4, 6)
+        alice &= bob
+        assert alice == both
+
+    def test_incompatible(self):
+        with pytest.raises(ValueError, match="different code spaces"):
+            CandidateSet.full(4, 6) & CandidateSet.full(4, 7)
+
+    def test_large_space(self):
+        candidates = CandidateSet.full(6, 10)
+        candidates.apply(Code.from_str("123456", 6, 10), 6, 0)
+        assert [str(code) for code in candidates] == ["123456"]
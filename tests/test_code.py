@@ -0,0 +1,66 @@
+import pytest
+
+from bnc.code import Code
+from bnc.utils import code_space, encode_codes
+
+
+class TestCodeConstruction:
+    def test_from_str(self):
+        code = Code.from_str("1234", 4, 6)
+        assert code.digits == (1, 2, 3, 4)
+        assert code.rank == 0 * 216 + 1 * 36 + 2 * 6 + 3
+        assert str(code) == "1234"
+
+    def test_from_digits(self):
+        assert Code.from_digits([6, 6, 6, 6], 6).rank == 6**4 - 1
+        assert Code.from_digits((1, 1, 1), 5).rank == 0
+
+    def test_unrank(self):
+        code = Code.unrank(1295, 4, 6)
+        assert str(code) == "6666"
+
+    def test_rank_out_of_range(self):
+        with pytest.raises(ValueError, match="out of range"):
+            Code.unrank(1296, 4, 6)
+
+    def test_invalid_strings(self):
+        with pytest.raises(ValueError, match="Code must be exactly 4 digits long"):
+            Code.from_str("123", 4, 6)
+        with pytest.raises(ValueError, match="Code must contain only digits"):
+            Code.from_str("12ab", 4, 6)
+        with pytest.raises(ValueError, match="Digit 7 is out of range"):
+            Code.from_str("1237", 4, 6)
+        with pytest.raises(ValueError, match="Digit 0 is out of range"):
+            Code.from_digits([1, 2, 3, 0], 6)
+
+    def test_rank_matches_code_space(self):
+        space = code_space(4, 6)
+        for rank in range(0, len(space), 37):
+            code = Code.unrank(rank, 4, 6)
+            assert list(code.digits) == space[rank].tolist()
+            assert encode_codes(space[rank], 6) == rank
+
+
+class TestCodeBehaviour:
+    def test_sequence_protocol(self):
+        code = Code.from_str("3516", 4, 6)
+        assert len(code) == 4
+        assert list(code) == [3, 5, 1, 6]
+        assert code[1] == 5
+        assert int(code) == code.rank
+
+    def test_hashable(self):
+        codes = {Code.from_str("1234", 4, 6), Code.from_str("1234", 4, 6)}
+        assert len(codes) == 1
+        assert Code.from_str("1234", 4, 6) != Code.from_str("1234", 4, 7)
+
+    def test_bytes_round_trip(self):
+        code = Code.from_str("654321", 6, 6)
+        data = code.to_bytes()
+        assert len(data) == Code.byte_width(6, 6) == 2
+        assert Code.from_bytes(data, 6, 6) == code
+
+    def test_immutable(self):
+        code = Code.from_str("1234", 4, 6)
+        with pytest.raises(AttributeError):
+            code.rank = 5
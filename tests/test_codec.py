@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from bnc import codec
+from bnc.state import GameConfig, GameMode, GameState
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(codec, "orjson", None)
+    elif codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+class TestCodec:
+    def test_round_trip(self, backend):
+        data = {"a": [1, 2, {"b": None}], "c": 'héllo "q"', "d": True, "e": 1.5}
+        text = codec.dumps(data)
+        assert isinstance(text, str)
+        assert codec.loads(text) == data
+        assert codec.loads(text.encode()) == data
+
+    def test_compact(self, backend):
+        assert codec.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+
+    def test_invalid_json(self, backend):
+        with pytest.raises(ValueError):
+            codec.loads("{not json")
+
+    def test_encode_array(self):
+        assert codec.encode_array([]) == "[]"
+        assert json.loads(codec.encode_array(['{"a":1}', "2"])) == [{"a": 1}, 2]
+
+
+class TestObjectLayout:
+    def test_join(self):
+        layout = codec.ObjectLayout("x", 'quote"d')
+        text = layout.join(["1", '"two"'])
+        assert json.loads(text) == {"x": 1, 'quote"d': "two"}
+
+    def test_empty(self):
+        assert codec.ObjectLayout().join([]) == "{}"
+
+    def test_fragment_count_must_match(self):
+        with pytest.raises(ValueError):
+            codec.ObjectLayout("a", "b").join(["1"])
+
+
+class TestGameStateJson:
+    def test_to_json_matches_to_dict(self, backend):
+        config = GameConfig(secret_code="1234", game_type=2)
+        state = GameState(config, mode=GameMode.MULTI_BOARD)
+        state.add_player("Zoë")
+        for guess in ["5555", "1243", "1234"]:
+            state.submit_guess("Zoë", guess)
+            assert json.loads(state.to_json()) == state.to_dict()
+
+    def test_reads_jsonpickle_output(self, backend):
+        # documents written by the previous jsonpickle-based codec
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        state.submit_guess("Alice", "1324")
+        legacy = json.dumps(state.to_dict())
+        restored = GameState.from_json(legacy, config)
+        assert restored.to_dict() == state.to_dict()
+        assert GameConfig.from_json(json.dumps(config.to_dict())) == config
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from bnc.feedback import (
+    build_feedback_matrix,
+    decode_feedback,
+    encode_feedback,
+    feedback_matrix_path,
+    load_feedback_matrix,
+    lookup_feedback,
+    num_of_feedbacks,
+)
+from bnc.utils import calculate_bulls_and_cows, code_space, encode_codes
+
+
+class TestEncodeFeedback:
+    def test_round_trip(self):
+        for bulls in range(5):
+            for cows in range(5 - bulls):
+                feedback = encode_feedback(bulls, cows, 4)
+                assert 0 <= feedback < num_of_feedbacks(4)
+                assert decode_feedback(feedback, 4) == (bulls, cows)
+
+
+class TestBuildFeedbackMatrix:
+    def test_matches_calculate_bulls_and_cows(self):
+        matrix = build_feedback_matrix(3, 5)
+        space = code_space(3, 5)
+        assert matrix.shape == (125, 125)
+        assert matrix.dtype == np.uint8
+        for guess in range(0, 125, 7):
+            for secret in range(0, 125, 11):
+                bulls, cows = calculate_bulls_and_cows(
+                    space[secret].tolist(), space[guess].tolist()
+                )
+                assert matrix[guess, secret] == encode_feedback(bulls, cows, 3)
+
+    def test_too_large(self):
+        with pytest.raises(ValueError, match="too large"):
+            build_feedback_matrix(6, 10)
+
+
+class TestLoadFeedbackMatrix:
+    def test_cached_on_disk_and_memory_mapped(self, tmp_path):
+        matrix = load_feedback_matrix(3, 5, cache_dir=tmp_path)
+        assert feedback_matrix_path(3, 5, tmp_path).exists()
+        assert isinstance(matrix, np.memmap)
+        assert not matrix.flags.writeable
+        assert load_feedback_matrix(3, 5, cache_dir=tmp_path) is matrix
+        assert np.array_equal(matrix, build_feedback_matrix(3, 5))
+
+    def test_mismatched_file_is_rebuilt(self, tmp_path):
+        # the wrong dtype, the wrong shape, and an empty file
+        for name, write in [
+            ("dtype", lambda path: np.save(path, np.zeros((125, 125), dtype=int))),
+            ("shape", lambda path: np.save(path, np.zeros((64, 64), dtype=np.uint8))),
+            ("empty", lambda path: path.write_bytes(b"")),
+        ]:
+            cache_dir = tmp_path / name
+            cache_dir.mkdir()
+            write(feedback_matrix_path(3, 5, cache_dir))
+            matrix = load_feedback_matrix(3, 5, cache_dir=cache_dir)
+            assert matrix.dtype == np.uint8
+            assert np.array_equal(matrix, build_feedback_matrix(3, 5))
+
+
+class TestLookupFeedback:
+    def test_from_matrix(self, tmp_path):
+        guesses = encode_codes(np.array([[1, 2, 3, 4], [1, 1, 2, 2]]), 6)
+        secrets = encode_codes(np.array([[1, 2, 3, 4], [4, 3, 2, 1]]), 6)
+        feedback = lookup_feedback(guesses, secrets, 4, 6, cache_dir=tmp_path)
+        assert feedback.tolist() == [
+            [encode_feedback(4, 0, 4), encode_feedback(0, 4, 4)],
+            [encode_feedback(1, 1, 4), encode_feedback(1, 1, 4)],
+        ]
+
+    def test_without_matrix(self):
+        guess = encode_codes(np.array([1, 2, 3, 4, 5, 6]), 10)
+        secret = encode_codes(np.array([6, 5, 4, 3, 2, 1]), 10)
+        feedback = lookup_feedback(guess, secret, 6, 10)
+        assert feedback.tolist() == [[encode_feedback(0, 6, 6)]]
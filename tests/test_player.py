@@ -87,9 +87,9 @@ class TestMakeGuess:
         player.make_guess("1111")
         player.make_guess("1234")
 
-        assert board.board[0].guess == [5, 5, 5, 5]
-        assert board.board[1].guess == [1, 1, 1, 1]
-        assert board.board[2].guess == [1, 2, 3, 4]
+        assert board.board[0].guess.digits == (5, 5, 5, 5)
+        assert board.board[1].guess.digits == (1, 1, 1, 1)
+        assert board.board[2].guess.digits == (1, 2, 3, 4)
         assert player.game_won is True
 
     def test_invalid_guess_format(self):
@@ -0,0 +1,177 @@
+import time
+
+import numpy as np
+import pytest
+
+from bnc import Board
+from bnc.code import Code
+from bnc.solver import (
+    AnytimeSolver,
+    EntropySolver,
+    KnuthSolver,
+    Solver,
+    default_opening,
+)
+
+
+class TestDefaultOpening:
+    def test_knuth_opening(self):
+        assert str(default_opening(4, 6)) == "1122"
+        assert str(default_opening(5, 8)) == "11223"
+
+
+class TestSolverCandidates:
+    def test_select_is_abstract(self):
+        class Incomplete(Solver):
+            pass
+
+        with pytest.raises(TypeError, match="select"):
+            Incomplete(3, 5)
+
+    def test_no_history(self):
+        solver = KnuthSolver(3, 5)
+        assert len(solver.candidates([])) == 125
+
+    def test_filters_by_history(self):
+        solver = KnuthSolver(4, 6)
+        candidates = solver.candidates([("1234", 4, 0)])
+        assert candidates.tolist() == [Code.from_str("1234", 4, 6).rank]
+
+    def test_partition_counts_sum_to_candidates(self):
+        solver = KnuthSolver(4, 6)
+        candidates = solver.candidates([("1122", 1, 0)])
+        counts = solver.partition_counts(np.array([0, 100, 1295]), candidates)
+        assert counts.shape == (3, 25)
+        assert (counts.sum(axis=1) == len(candidates)).all()
+
+
+class TestKnuthSolver:
+    def test_first_guess(self):
+        assert str(KnuthSolver(4, 6).next_guess()) == "1122"
+
+    def test_single_candidate(self):
+        solver = KnuthSolver(4, 6)
+        assert str(solver.next_guess([("1234", 4, 0)])) == "1234"
+
+    def test_inconsistent_history(self):
+        solver = KnuthSolver(4, 6)
+        with pytest.raises(ValueError, match="No code is consistent"):
+            solver.next_guess([("1234", 4, 0), ("1234", 0, 0)])
+
+    def test_solves_4x6_in_five_guesses(self):
+        solver = KnuthSolver(4, 6)
+        for rank in range(0, 1296, 53):
+            secret = Code.unrank(rank, 4, 6)
+            guesses = solver.solve(secret)
+            assert guesses[-1] == secret
+            assert len(guesses) <= 5
+
+    def test_solves_5x8(self):
+        solver = KnuthSolver(5, 8)
+        guesses = solver.solve("35718")
+        assert str(guesses[-1]) == "35718"
+        assert len(guesses) <= 6
+
+    def test_next_guess_for_board(self):
+        board = Board(secret_code="1234")
+        solver = KnuthSolver(4, 6)
+        while not board.game_over:
+            guess = solver.next_guess_for_board(board)
+            board.evaluate_guess(board.current_board_row_index, guess)
+        assert board.game_won is True
+        assert board.current_board_row_index <= 5
+
+    def test_board_mismatch(self):
+        with pytest.raises(ValueError, match="does not match"):
+            KnuthSolver(5, 8).next_guess_for_board(Board())
+
+
+class TestEntropySolver:
+    def test_first_guess(self):
+        assert str(EntropySolver(4, 6).next_guess()) == "1234"
+
+    def test_partition_entropy(self):
+        solver = EntropySolver(4, 6)
+        candidates = np.arange(1296)
+        counts = solver.partition_counts(np.array([0]), candidates)[0]
+        probabilities = counts[counts > 0] / 1296
+        expected = -(probabilities * np.log2(probabilities)).sum()
+        entropy = solver.partition_entropy(np.array([0]), candidates)
+        assert entropy[0] == pytest.approx(expected)
+
+    def test_single_partition_has_no_entropy(self):
+        solver = EntropySolver(4, 6)
+        candidates = solver.candidates([("1234", 4, 0)])
+        assert solver.partition_entropy(np.array([5]), candidates)[0] == 0
+
+    def test_solves_4x6(self):
+        solver = EntropySolver(4, 6)
+        total = 0
+        for rank in range(0, 1296, 53):
+            secret = Code.unrank(rank, 4, 6)
+            guesses = solver.solve(secret)
+            assert guesses[-1] == secret
+            assert len(guesses) <= 6
+            total += len(guesses)
+        assert total / len(range(0, 1296, 53)) < 5
+
+
+class TestAnytimeSolver:
+    def test_solves_4x6(self):
+        solver = AnytimeSolver(4, 6, time_budget=0.02, seed=7)
+        for secret in ["1234", "6611", "3535"]:
+            guesses = solver.solve(secret)
+            assert str(guesses[-1]) == secret
+            assert len(guesses) <= 7
+
+    def test_exact_candidates_for_small_spaces(self):
+        solver = AnytimeSolver(4, 6, seed=7)
+        assert str(solver.next_guess([("1234", 4, 0)])) == "1234"
+        with pytest.raises(ValueError, match="No code is consistent"):
+            solver.next_guess([("1234", 4, 0), ("1234", 0, 0)])
+
+    def test_sampled_candidates_are_consistent(self):
+        solver = AnytimeSolver(8, 10, sample_size=64, seed=7)
+        secret = Code.from_str("12345678", 8, 10)
+        history = []
+        for guess in ["11223344", "55667788", "13572468"]:
+            code = Code.from_str(guess, 8, 10)
+            feedback = int(solver.feedback(code.rank, secret.rank)[0, 0])
+            history.append((code, *divmod(feedback, 9)))
+
+        candidates = solver.sample_candidates(history, time.perf_counter() + 1.0)
+        assert 0 < len(candidates) <= 64
+        for guess, feedback in solver.encode_history(history):
+            assert (solver.feedback(guess, candidates)[0] == feedback).all()
+
+    def test_respects_time_budget(self):
+        # sampled (8x10) and enumerated (7x7, 6x9) candidates alike
+        for code_length, num_of_colors, history in [
+            (8, 10, [("11223344", 1, 2), ("55667788", 0, 3)]),
+            (7, 7, [("1122334", 1, 2), ("5566771", 0, 3)]),
+            (6, 9, [("112233", 1, 2)]),
+        ]:
+            solver = AnytimeSolver(code_length, num_of_colors, time_budget=0.05, seed=7)
+            solver.next_guess(history)
+            start = time.perf_counter()
+            guess = solver.next_guess(history)
+            assert time.perf_counter() - start < 0.15
+            assert (guess.code_length, guess.num_of_colors) == (
+                code_length,
+                num_of_colors,
+            )
+
+    def test_enumeration_cut_short_by_the_deadline(self):
+        solver = AnytimeSolver(7, 7, sample_size=64, seed=7)
+        history = [("1122334", 1, 2), ("5566771", 0, 3)]
+        candidates, exact = solver._sample_candidates(history, time.perf_counter())
+        assert exact is False
+        assert 0 < len(candidates) <= 64
+        for guess, feedback in solver.encode_history(history):
+            assert (solver.feedback(guess, candidates)[0] == feedback).all()
+
+        candidates, exact = solver._sample_candidates(
+            history, time.perf_counter() + 10.0
+        )
+        assert exact is True
+        assert len(candidates) == 64
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from bnc.sources import (
+    LocalSecretSource,
+    RandomNumberPool,
+    RandomOrgSecretSource,
+    SecretSource,
+    get_default_secret_source,
+    set_default_secret_source,
+)
+
+
+class RandomOrgStandIn(BaseHTTPRequestHandler):
+    # answers like random.org's plain integer API, counting up from min
+    status = 200
+    requests: list[int] = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.requests.append(int(query["num"][0]))
+        num, low = int(query["num"][0]), int(query["min"][0])
+        body = "\n".join(str(low + i % 3) for i in range(num)).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FailingStandIn(RandomOrgStandIn):
+    status = 503
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(handler=RandomOrgStandIn):
+        handler.requests.clear()
+        server = HTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/integers/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestSecretSource:
+    def test_generate_is_abstract(self):
+        class Incomplete(SecretSource):
+            pass
+
+        with pytest.raises(TypeError, match="generate"):
+            Incomplete()
+
+
+class TestLocalSecretSource:
+    def test_generate(self):
+        source = LocalSecretSource()
+        for _ in range(50):
+            code = source.generate(5, 7)
+            assert len(code) == 5
+            assert all(1 <= int(digit) <= 7 for digit in code)
+
+    def test_generate_async(self):
+        code = asyncio.run(LocalSecretSource().generate_async(4, 6))
+        assert len(code) == 4
+
+
+class TestRandomOrgSecretSource:
+    def test_generate(self, stand_in):
+        source = RandomOrgSecretSource(url=stand_in())
+        assert source.generate(4, 6) == "1231"
+
+    def test_generate_async(self, stand_in):
+        source = RandomOrgSecretSource(url=stand_in())
+        assert asyncio.run(source.generate_async(5, 6)) == "12312"
+
+    def test_secrets_are_buffer_pops(self, stand_in):
+        source = RandomOrgSecretSource(
+            url=stand_in(), low_watermark=8, high_watermark=64
+        )
+        codes = [source.generate(4, 6) for _ in range(16)]
+        assert all(len(code) == 4 for code in codes)
+        assert RandomOrgStandIn.requests == [64]
+        source.generate(5, 8)
+        assert RandomOrgStandIn.requests == [64, 64]
+
+    def test_falls_back_when_remote_fails(self, stand_in):
+        source = RandomOrgSecretSource(url=stand_in(FailingStandIn))
+        code = source.generate(4, 6)
+        assert len(code) == 4
+        assert all(1 <= int(digit) <= 6 for digit in code)
+
+
+class TestRandomNumberPool:
+    def test_invalid_watermarks(self):
+        with pytest.raises(ValueError, match="Watermarks"):
+            RandomNumberPool(1, 6, low_watermark=10, high_watermark=10)
+        with pytest.raises(ValueError, match="Watermarks"):
+            RandomNumberPool(1, 6, high_watermark=20_000)
+        with pytest.raises(ValueError, match="must be less than"):
+            RandomNumberPool(6, 6)
+
+    def test_take_serves_from_one_request(self, stand_in):
+        pool = RandomNumberPool(
+            1, 6, low_watermark=16, high_watermark=400, url=stand_in()
+        )
+        taken = [pool.take(4) for _ in range(100)]
+        assert taken[0] == [1, 2, 3, 1]
+        assert RandomOrgStandIn.requests == [400]
+        assert len(pool) == 0
+
+        pool.take(4)
+        assert RandomOrgStandIn.requests == [400, 400]
+        assert len(pool) == 396
+
+    def test_take_async_refills_in_background(self, stand_in):
+        pool = RandomNumberPool(
+            1, 6, low_watermark=16, high_watermark=32, url=stand_in()
+        )
+
+        async def play():
+            await pool.take_async(20)
+            assert RandomOrgStandIn.requests == [32]
+            assert len(pool) == 12
+            # below the low watermark: a refill is already in flight
+            await pool._refill_task
+            assert RandomOrgStandIn.requests == [32, 20]
+            assert len(pool) == 32
+
+        asyncio.run(play())
+
+    def test_take_never_blocks_a_running_loop(self, stand_in):
+        pool = RandomNumberPool(
+            1, 6, low_watermark=16, high_watermark=32, url=stand_in()
+        )
+
+        async def play():
+            # nothing buffered yet: served locally, the refill runs on the loop
+            numbers = pool.take(20)
+            assert len(numbers) == 20
+            assert all(1 <= n <= 6 for n in numbers)
+            assert RandomOrgStandIn.requests == []
+            await pool._refill_task
+            assert RandomOrgStandIn.requests == [32]
+
+            # a partial shortfall uses what is buffered first
+            assert pool.take(40)[:3] == [1, 2, 3]
+            assert len(pool) == 0
+            await pool._refill_task
+            assert RandomOrgStandIn.requests == [32, 32]
+
+        asyncio.run(play())
+
+    def test_falls_back_when_remote_fails(self, stand_in):
+        pool = RandomNumberPool(1, 6, url=stand_in(FailingStandIn))
+        numbers = pool.take(8)
+        assert len(numbers) == 8
+        assert all(1 <= n <= 6 for n in numbers)
+        assert asyncio.run(pool.take_async(3))
+        assert len(pool) == 0
+
+
+class TestDefaultSecretSource:
+    def test_local_by_default(self):
+        assert isinstance(get_default_secret_source(), LocalSecretSource)
+
+    def test_replace_default(self):
+        class FixedSource(SecretSource):
+            def generate(self, code_length, num_of_colors):
+                return "1" * code_length
+
+        previous = get_default_secret_source()
+        set_default_secret_source(FixedSource())
+        try:
+            assert get_default_secret_source().generate(4, 6) == "1111"
+            assert asyncio.run(get_default_secret_source().generate_async(3, 6)) == (
+                "111"
+            )
+        finally:
+            set_default_secret_source(previous)
@@ -1,10 +1,24 @@
+import copy
+import pickle
 from datetime import datetime, timezone
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from bnc import Board, Game, Player
-from bnc.state import GameConfig, GameMode, GameState, PlayerGuess, PlayerState
+from bnc.solver import KnuthSolver
+from bnc.state import (
+    GameConfig,
+    GameMode,
+    GameState,
+    GuessLog,
+    LazyGuessList,
+    PlayerGuess,
+    PlayerState,
+    PlayerTable,
+)
+from bnc.tree import DecisionTree
+from bnc.utils import validate_code_input
 
 
 class TestPlayerGuess:
@@ -45,6 +59,22 @@ class TestPlayerGuess:
         guess = PlayerGuess.from_dict(data)
         assert isinstance(guess.timestamp, datetime)
 
+    def test_compact_layout(self):
+        guess = PlayerGuess("".join("1234"), 2, 1, "".join("Alice"))
+        assert not hasattr(guess, "__dict__")
+        assert guess.guess is PlayerGuess("1234", 0, 0, "Bob").guess
+        assert guess.player is PlayerGuess("1111", 0, 0, "Alice").player
+
+    def test_timestamp_round_trip(self):
+        timestamp = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)
+        guess = PlayerGuess("1234", 2, 1, "Alice", timestamp)
+        assert guess.timestamp == timestamp
+        assert guess.timestamp_us == 1714979289123456
+        assert PlayerGuess.from_dict(guess.to_dict()) == guess
+
+        guess.timestamp = datetime(2024, 5, 6, 7, 8, 9)
+        assert guess.timestamp == datetime(2024, 5, 6, 7, 8, 9, tzinfo=timezone.utc)
+
 
 class TestPlayerState:
     def test_initialization(self):
@@ -124,9 +154,27 @@ class TestGameConfig:
 
     def test_generate_secret_code(self):
         config = GameConfig(code_length=5, num_of_colors=7)
-        with patch("bnc.state.get_random_number", return_value="12345"):
+        with patch(
+            "bnc.sources.LocalSecretSource.generate", return_value="12345"
+        ) as generate:
             code = config.generate_secret_code()
             assert code == "12345"
+            generate.assert_called_once_with(5, 7)
+
+    def test_generate_secret_code_is_local_by_default(self):
+        config = GameConfig(code_length=5, num_of_colors=7)
+        with patch("bnc.utils.httpx.Client.get") as mock_get:
+            code = config.generate_secret_code()
+        mock_get.assert_not_called()
+        assert len(code) == 5
+        assert all(1 <= int(digit) <= 7 for digit in code)
+
+    def test_generate_secret_code_with_source(self):
+        source = Mock()
+        source.generate.return_value = "4321"
+        config = GameConfig(secret_source=source)
+        assert config.generate_secret_code() == "4321"
+        source.generate.assert_called_once_with(4, 6)
 
     def test_to_dict(self):
         config = GameConfig(secret_code="1234")
@@ -199,6 +247,285 @@ class TestGameState:
         }
         assert state.game_over is True
 
+    def test_status_counters_follow_submit_guess(self):
+        config = GameConfig(secret_code="1234", num_of_guesses=3, game_type=2)
+        state = GameState(config, mode=GameMode.MULTI_BOARD)
+        for _ in range(3):
+            state.submit_guess("Alice", "5555")
+        assert state.guess_count("Alice") == 3
+        assert state.game_over is True
+
+        state.submit_guess("Bob", "5555")
+        assert state.game_over is False
+        state.submit_guess("Bob", "1234")
+        assert state.game_won is True
+        state.submit_guess("Bob", "6666")
+        assert state.game_over is True
+
+        # a player going past the limit no longer counts as finished
+        state.submit_guess("Alice", "5555")
+        assert state.game_over is False
+
+    def test_status_counters_follow_config_changes(self):
+        config = GameConfig(secret_code="1234", num_of_guesses=5, game_type=2)
+        state = GameState(config, mode=GameMode.MULTI_BOARD)
+        for guess in ["5555", "1235"]:
+            state.submit_guess("Alice", guess)
+        assert state.game_over is False
+        assert state.game_won is False
+
+        state.config.num_of_guesses = 2
+        assert state.game_over is True
+        state.config.code_length = 3
+        state.config.secret_code = "123"
+        assert state.game_won is True
+
+    def test_status_counters_rebuilt_on_assignment(self):
+        config = GameConfig(secret_code="1234", num_of_guesses=2)
+        state = GameState(config, mode=GameMode.MULTI_BOARD)
+        state.all_guesses = [
+            PlayerGuess("5555", 0, 0, "Alice"),
+            PlayerGuess("1234", 4, 0, "Alice"),
+        ]
+        assert state.guess_count("Alice") == 2
+        assert state.game_over is True
+        assert state.game_won is True
+
+        state.all_guesses = []
+        assert state.guess_count("Alice") == 0
+        assert state.game_over is False
+        assert state.game_won is False
+
+    def test_secret_parsed_once(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        with (
+            patch("bnc.state.validate_code_input", wraps=validate_code_input) as parse,
+            patch("bnc.state.Code.from_str") as from_str,
+        ):
+            for guess in ["5555", "1324", "4321"]:
+                state.submit_guess("Alice", guess)
+        # one parse per guess plus a single parse of the secret, and no
+        # round trip through a ranked Code
+        assert parse.call_count == 4
+        from_str.assert_not_called()
+        assert [g.bulls for g in state.all_guesses] == [0, 2, 0]
+
+    def test_secret_cache_follows_secret_changes(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        state.submit_guess("Alice", "1234")
+        assert state.all_guesses[-1].bulls == 4
+
+        state.config.secret_code = "4321"
+        state.submit_guess("Alice", "4321")
+        assert state.all_guesses[-1].bulls == 4
+
+        with patch("bnc.state.GameConfig.generate_secret_code", return_value="5656"):
+            state.reset()
+        state.submit_guess("Alice", "5656")
+        assert state.game_won is True
+
+    def test_version_increases_on_changes(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        assert state.version == 0
+        state.add_player("Alice")
+        assert state.version == 1
+        state.submit_guess("Alice", "5555")
+        assert state.version == 2
+        state.submit_guess("Alice", "bad")
+        assert state.version == 2
+        assert state.to_dict()["version"] == 2
+
+        state.game_started = True
+        assert state.version == 3
+        delta = state.diff_since(2)
+        assert delta["full"] is False
+        assert delta["game_started"] is True
+        state.mode = GameMode.MULTI_BOARD
+        assert state.version == 4
+        assert state.diff_since(3)["full"] is True
+
+    def test_submit_guess_delta(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        state.submit_guess("Alice", "5555")
+        delta = state.submit_guess("Alice", "1234", delta=True)
+        assert delta["full"] is False
+        assert delta["since"] == 1
+        assert delta["version"] == 2
+        assert [g["guess"] for g in delta["guesses"]] == ["1234"]
+        assert delta["game_over"] is True
+        assert delta["game_won"] is True
+        assert delta["secret_code"] == "1234"
+        assert delta["winners"] == ["Alice"]
+        assert "players_data" not in delta
+
+    def test_diff_since(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        for guess in ["5555", "6666", "1324"]:
+            state.submit_guess("Alice", guess)
+        assert [g["guess"] for g in state.diff_since(1)["guesses"]] == [
+            "6666",
+            "1324",
+        ]
+        assert state.diff_since(3)["guesses"] == []
+        assert state.diff_since(0)["current_row"] == 3
+
+    def test_diff_since_falls_back_to_full_state(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        state.submit_guess("Alice", "5555")
+        assert state.diff_since(5)["full"] is True
+
+        with patch("bnc.state.GameConfig.generate_secret_code", return_value="5656"):
+            state.reset()
+        full = state.diff_since(1)
+        assert full["full"] is True
+        assert full["guesses"] == []
+        assert full["version"] == state.version
+        assert state.diff_since(state.version)["full"] is False
+
+    def test_version_survives_round_trip(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        state.submit_guess("Alice", "5555")
+        restored = GameState.from_dict(state.to_dict(), config)
+        assert restored.version == 1
+        restored.submit_guess("Alice", "6666")
+        assert [g["guess"] for g in restored.diff_since(1)["guesses"]] == ["6666"]
+        assert restored.diff_since(0)["full"] is True
+
+    def test_to_dict_is_memoized(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        state.submit_guess("Alice", "5555")
+        first = state.to_dict()
+        second = state.to_dict()
+        assert first == second
+        assert first["guesses"] is second["guesses"]
+        assert state.to_json() is state.to_json()
+
+    def test_to_dict_serializes_only_new_guesses(self):
+        state = GameState(GameConfig(secret_code="1234", num_of_guesses=20))
+        with patch.object(
+            PlayerGuess, "to_dict", autospec=True, side_effect=PlayerGuess.to_dict
+        ) as to_dict:
+            for guess in ["5555", "6666", "1324"]:
+                state.submit_guess("Alice", guess)
+            assert to_dict.call_count == 3
+            assert len(state.to_dict()["guesses"]) == 3
+            assert to_dict.call_count == 3
+
+    def test_to_dict_invalidated_by_changes(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        before = state.to_dict()
+        json_before = state.to_json()
+
+        state.add_player("Alice")
+        assert state.to_dict()["players"] == ["Alice"]
+        assert before["players"] == []
+        assert state.to_json() != json_before
+
+        state.remove_player("Alice")
+        assert state.to_dict()["players"] == []
+
+        state.game_started = True
+        assert state.to_dict()["game_started"] is True
+
+        state.config.secret_code = "4321"
+        assert state.to_dict()["config"]["secret_code"] == "4321"
+
+        state.winners.append("Bob")
+        assert state.to_dict()["winners"] == ["Bob"]
+
+        with patch("bnc.state.GameConfig.generate_secret_code", return_value="5656"):
+            state.reset()
+        assert state.to_dict()["winners"] == []
+
+    def test_to_dict_sees_changes_made_in_place(self):
+        state = GameState(GameConfig(secret_code="1234"), all_guesses=[])
+        state.add_player("Jae")
+        state.submit_guess("Jae", "1243")
+        version = state.version
+        json_before = state.to_json()
+
+        state.all_guesses[-1].player = "Soo"
+        assert state.to_dict()["guesses"][-1]["player"] == "Soo"
+        assert state.to_json() != json_before
+        assert state.diff_since(version)["full"] is True
+
+        state.player_states["Jae"].game_won = True
+        assert state.to_dict()["players_data"]["Jae"]["game_won"] is True
+        state.player_states["Jae"].guesses.append(state.all_guesses[0])
+        assert len(state.to_dict()["players_data"]["Jae"]["guesses"]) == 1
+        state.player_states["Soo"] = PlayerState(name="Soo")
+        assert "Soo" in state.to_dict()["players_data"]
+        state.players.append("Soo")
+        assert state.to_dict()["players"] == ["Jae", "Soo"]
+
+        state.all_guesses.append(PlayerGuess("1234", 4, 0, "Jae"))
+        assert state.game_won is True
+        assert state.guess_count("Jae") == 1
+
+    def test_only_history_changes_reset_guess_caches(self):
+        state = GameState(
+            GameConfig(secret_code="1234", game_type=2), mode=GameMode.MULTI_BOARD
+        )
+        state.add_player("Jae")
+        state.submit_guess("Jae", "1243")
+        state.player_states["Jae"].guesses.append(state.all_guesses[0])
+        with patch.object(
+            state, "_reset_guess_caches", wraps=state._reset_guess_caches
+        ) as reset:
+            version = state.version
+            state.player_states["Jae"].current_row += 1
+            state.winners.append("Jae")
+            state.players.append("Soo")
+            assert state.version == version + 3
+            assert state.to_dict()["players_data"]["Jae"]["current_row"] == 1
+            reset.assert_not_called()
+
+            # a guess in the history is the history's wherever else it is
+            state.player_states["Jae"].guesses[0].bulls = 3
+            reset.assert_called_once()
+        assert state.to_dict()["guesses"][0]["bulls"] == 3
+
+    def test_records_shared_with_another_state_are_copied(self):
+        first = GameState(GameConfig(secret_code="1234"))
+        first.submit_guess("Jae", "1243")
+        second = GameState(
+            GameConfig(secret_code="1234"), all_guesses=list(first.all_guesses)
+        )
+        assert second.all_guesses == first.all_guesses
+        assert second.all_guesses[0] is not first.all_guesses[0]
+
+        second.all_guesses[0].player = "Soo"
+        assert first.to_dict()["guesses"][0]["player"] == "Jae"
+        assert second.to_dict()["guesses"][0]["player"] == "Soo"
+
+    def test_copy_and_pickle(self):
+        for all_guesses in [None, GuessLog()]:
+            config = GameConfig(secret_code="1234", game_type=2)
+            state = GameState(
+                config, mode=GameMode.MULTI_BOARD, all_guesses=all_guesses
+            )
+            state.add_player("Jae")
+            state.submit_guess("Jae", "1243")
+            data = state.to_dict()
+            for duplicate in [
+                copy.copy,
+                copy.deepcopy,
+                lambda value: pickle.loads(pickle.dumps(value)),
+            ]:
+                guess = duplicate(state.all_guesses[0])
+                assert guess == state.all_guesses[0]
+                copied = duplicate(state)
+                assert copied.to_dict() == data
+
+                copied.player_states["Jae"].current_row = 5
+                copied.submit_guess("Jae", "1234")
+                assert copied.to_dict()["players_data"]["Jae"]["current_row"] == 5
+                assert len(copied.to_dict()["guesses"]) == 2
+                assert state.to_dict() == data
+
     def test_add_player(self):
         config = GameConfig()
         state = GameState(config)
@@ -320,3 +647,459 @@ class TestGameState:
 
         assert len(restored.all_guesses) == 1
         assert "Alice" in restored.players
+
+    def test_remaining_candidates(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        assert len(state.remaining_candidates()) == 1296
+
+        state.submit_guess("Alice", "1122")
+        state.submit_guess("Bob", "3344")
+        shared = state.remaining_candidates()
+        assert shared == state.remaining_candidates("Alice") & (
+            state.remaining_candidates("Bob")
+        )
+        assert "1234" in shared
+
+        state.submit_guess("Alice", "1234")
+        assert [str(code) for code in state.remaining_candidates()] == ["1234"]
+
+    def test_remaining_candidates_after_reset(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        state.submit_guess("Alice", "1234")
+        assert len(state.remaining_candidates()) == 1
+
+        with patch("bnc.state.GameConfig.generate_secret_code", return_value="5566"):
+            state.reset()
+        assert len(state.remaining_candidates()) == 1296
+
+    def test_hint_from_solver(self):
+        config = GameConfig(secret_code="1234")
+        state = GameState(config)
+        solver = KnuthSolver(4, 6)
+        assert state.hint(solver) == "1122"
+
+        state.submit_guess("Alice", "1122")
+        assert state.hint(solver) == str(solver.next_guess([("1122", 1, 1)]))
+        assert state.hint(solver, "Bob") == "1122"
+
+    def test_hint_from_decision_tree(self):
+        config = GameConfig(code_length=3, num_of_colors=5, secret_code="123")
+        state = GameState(config)
+        solver = KnuthSolver(3, 5)
+        tree = DecisionTree.compile(solver)
+
+        while not state.game_over:
+            hint = state.hint(tree)
+            assert hint == state.hint(solver)
+            state.submit_guess("Alice", hint)
+        assert state.game_won is True
+
+        state.all_guesses = [PlayerGuess("555", 0, 0, "Alice")]
+        assert state.hint(tree) is None
+
+
+class TestGameStateSnapshot:
+    def make_state(self):
+        config = GameConfig(secret_code="1234", game_type=2, num_of_guesses=20)
+        state = GameState(config, mode=GameMode.MULTI_BOARD, game_started=True)
+        for name in ["Alice", "Bob", "Zoë"]:
+            state.add_player(name)
+        for i, guess in enumerate(["5555", "1243", "6612", "1234"]):
+            state.submit_guess(["Alice", "Bob", "Zoë"][i % 3], guess)
+        return state
+
+    def test_round_trip(self):
+        state = self.make_state()
+        restored = GameState.from_bytes(state.to_bytes())
+        assert restored.to_dict() == state.to_dict()
+        assert restored.mode == GameMode.MULTI_BOARD
+        assert restored.config == state.config
+        assert restored.version == state.version
+        assert restored.game_won is True
+        assert [g.timestamp for g in restored.all_guesses] == [
+            g.timestamp for g in state.all_guesses
+        ]
+
+    def test_round_trip_player_states(self):
+        state = self.make_state()
+        state.player_states["Alice"].guesses = [state.all_guesses[0]]
+        state.player_states["Alice"].game_over = True
+        state.mark_dirty()
+        restored = GameState.from_bytes(memoryview(state.to_bytes()))
+        assert restored.player_states == state.player_states
+
+    def test_smaller_than_json(self):
+        state = self.make_state()
+        assert len(state.to_bytes()) * 4 < len(state.to_json())
+
+    def test_new_guesses_after_snapshot(self):
+        state = self.make_state()
+        state.to_bytes()
+        state.submit_guess("Newcomer", "3456")
+        restored = GameState.from_bytes(state.to_bytes())
+        assert restored.all_guesses[-1].player == "Newcomer"
+        assert restored.to_dict() == state.to_dict()
+
+        state.all_guesses = state.all_guesses[:1]
+        assert len(GameState.from_bytes(state.to_bytes()).all_guesses) == 1
+
+    def test_naive_timestamps_are_utc(self):
+        state = GameState(GameConfig(secret_code="1234"))
+        state.all_guesses = [
+            PlayerGuess("5555", 0, 0, "Alice", datetime(2024, 1, 2, 3, 4, 5, 6))
+        ]
+        restored = GameState.from_bytes(state.to_bytes())
+        assert restored.all_guesses[0].timestamp == datetime(
+            2024, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc
+        )
+
+    def test_invalid_snapshots(self):
+        data = self.make_state().to_bytes()
+        with pytest.raises(ValueError, match="Not a game state snapshot"):
+            GameState.from_bytes(b"JSON" + data[4:])
+        with pytest.raises(ValueError, match="Unsupported snapshot format"):
+            GameState.from_bytes(data[:4] + b"\x63" + data[5:])
+        with pytest.raises(ValueError, match="Truncated"):
+            GameState.from_bytes(data[:-3])
+        with pytest.raises(ValueError, match="Truncated"):
+            GameState.from_bytes(data[:10])
+
+    def test_code_space_too_large(self):
+        state = GameState(GameConfig(code_length=21, num_of_colors=9))
+        with pytest.raises(ValueError, match="too large for snapshots"):
+            state.to_bytes()
+
+    def test_header_field_out_of_range(self):
+        for field_name, config in [
+            ("num_of_colors", GameConfig(secret_code="1234", num_of_colors=300)),
+            ("num_of_guesses", GameConfig(secret_code="1234", num_of_guesses=70000)),
+            ("game_type", GameConfig(secret_code="1234", game_type=256)),
+        ]:
+            with pytest.raises(ValueError, match=f"^{field_name} .* does not fit"):
+                GameState(config).to_bytes()
+
+
+class TestLazyGuessList:
+    def raw(self):
+        return [
+            PlayerGuess("5555", 0, 0, "Alice").to_dict(),
+            PlayerGuess("1243", 2, 2, "Bob").to_dict(),
+            PlayerGuess("1234", 4, 0, "Alice").to_dict(),
+        ]
+
+    def test_decodes_on_access(self):
+        guesses = LazyGuessList(self.raw())
+        with patch.object(
+            PlayerGuess, "from_dict", side_effect=PlayerGuess.from_dict
+        ) as from_dict:
+            assert len(guesses) == 3
+            assert from_dict.call_count == 0
+            assert guesses[-1].guess == "1234"
+            assert guesses[-1] is guesses[2]
+            assert from_dict.call_count == 1
+            assert list(guesses.players_and_bulls()) == [
+                ("Alice", 0),
+                ("Bob", 2),
+                ("Alice", 4),
+            ]
+            assert from_dict.call_count == 1
+
+    def test_list_behaviour(self):
+        raw = self.raw()
+        guesses = LazyGuessList(raw)
+        eager = [PlayerGuess.from_dict(g) for g in raw]
+        assert guesses == eager
+        assert guesses[1:] == eager[1:]
+        with pytest.raises(IndexError):
+            guesses[3]
+
+        extra = PlayerGuess("6666", 0, 0, "Carol")
+        guesses.append(extra)
+        assert guesses[3] is extra
+        assert len(guesses) == 4
+
+        del guesses[0]
+        assert [g.guess for g in guesses] == ["1243", "1234", "6666"]
+        guesses[0] = extra
+        guesses.append(extra)
+        assert [g.player for g in guesses] == ["Carol", "Alice", "Carol", "Carol"]
+        # the raw dicts are never modified
+        assert len(raw) == 3
+
+
+class TestPlayerTable:
+    def test_ids(self):
+        table = PlayerTable(["Alice", "Bob"])
+        assert table == ["Alice", "Bob"]
+        assert (table.id("Alice"), table.id("Bob")) == (0, 1)
+        assert table.id("Carol") == 2
+        assert "Carol" not in table
+        assert table.get_id("Dave") is None
+
+        table.remove("Alice")
+        assert "Alice" not in table
+        assert table.names[0] == "Alice"
+        table.append("Carol")
+        table.append("Alice")
+        table.append("Bob")
+        assert table == ["Bob", "Carol", "Alice"]
+        assert table.id("Alice") == 0
+        assert table.count("Bob") == 1
+        with pytest.raises(ValueError, match="not a player"):
+            table.remove("Dave")
+
+    def test_list_behaviour(self):
+        table = PlayerTable(["Alice", "Bob", "Carol"])
+        assert table[-1] == "Carol"
+        assert table[:2] == ["Alice", "Bob"]
+        del table[0]
+        table.insert(0, "Dave")
+        table[1] = "Erin"
+        assert list(table) == ["Dave", "Erin", "Carol"]
+        assert table.index("Carol") == 2
+        # indexing reuses one ordered list of ids until the order changes
+        order = table._ordered()
+        table.append("Frank")
+        assert table._ordered() is order
+        assert [table[i] for i in range(len(table))] == list(table)
+        table.remove("Erin")
+        assert table[1] == "Carol"
+        table.clear()
+        assert len(table) == 0
+        assert table.names == ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+
+
+class TestGuessLog:
+    def entries(self):
+        return [
+            PlayerGuess("5555", 0, 0, "Alice", timestamp_us=1),
+            PlayerGuess("1243", 2, 2, "Bob", timestamp_us=2),
+            PlayerGuess("5555", 0, 0, "Bob", timestamp_us=3),
+        ]
+
+    def test_columns(self):
+        log = GuessLog(self.entries())
+        assert log == self.entries()
+        assert log.code_table == ["5555", "1243"]
+        assert log.player_table == ["Alice", "Bob"]
+        assert list(log.code_id) == [0, 1, 0]
+        assert list(log.player_id) == [0, 1, 1]
+        assert list(log.bulls) == [0, 2, 0]
+        assert log.counts_by_player() == {"Alice": 1, "Bob": 2}
+        assert log.history(player="Bob") == [("1243", 2, 2), ("5555", 0, 0)]
+        assert log.history(1) == [("1243", 2, 2), ("5555", 0, 0)]
+        assert log.history(player="Carol") == []
+        assert log.to_dicts(2) == [self.entries()[2].to_dict()]
+
+    def test_list_behaviour(self):
+        log = GuessLog(self.entries())
+        extra = PlayerGuess("6666", 1, 0, "Carol")
+        log.append(extra)
+        assert log[-1] == extra
+        assert log[1:3] == self.entries()[1:]
+
+        del log[0]
+        assert [g.guess for g in log] == ["1243", "5555", "6666"]
+        log[0] = extra
+        log.insert(1, extra)
+        log[2:] = [extra]
+        assert [g.player for g in log] == ["Carol", "Carol", "Carol"]
+
+        # entries are read-only copies of a row
+        with pytest.raises(AttributeError, match="read-only"):
+            log[0].bulls = 4
+        with pytest.raises(AttributeError, match="read-only"):
+            log[0].timestamp = datetime.now(timezone.utc)
+        assert log[0].bulls == 1
+        assert log[0] == extra
+
+
+class TestGameStatePlayerIds:
+    def test_guesses_refer_to_player_ids(self):
+        state = GameState(
+            GameConfig(secret_code="1234", num_of_guesses=20), all_guesses=GuessLog()
+        )
+        for name in ["Alice", "Bob"]:
+            state.add_player(name)
+        state.submit_guess("Bob", "5555")
+        state.submit_guess("Guest", "6666")
+        assert state.all_guesses.players is state.players
+        assert list(state.all_guesses.player_id) == [1, 2]
+        assert state.players == ["Alice", "Bob"]
+
+        state.remove_player("Bob")
+        state.players = [*state.players, "Carol"]
+        assert state.all_guesses[0].player == "Bob"
+        assert state.players.id("Carol") == 3
+        assert state.to_dict()["players"] == ["Alice", "Carol"]
+
+    def test_guesses_given_are_moved_to_player_ids(self):
+        log = GuessLog([PlayerGuess("5555", 0, 0, "Bob", timestamp_us=1)])
+        state = GameState(
+            GameConfig(secret_code="1234"), players=["Alice", "Bob"], all_guesses=log
+        )
+        assert state.all_guesses is log
+        assert list(log.player_id) == [1]
+        assert log[0].player == "Bob"
+
+        # a plain list stays a list of PlayerGuess objects
+        guesses = [PlayerGuess("6666", 0, 0, "Alice", timestamp_us=2)]
+        state.all_guesses = guesses
+        assert isinstance(state.all_guesses, list)
+        assert state.all_guesses[0] is guesses[0]
+
+    def test_snapshot_player_ids(self):
+        state = GameState(
+            GameConfig(secret_code="1234"),
+            players=["Alice", "Bob"],
+            all_guesses=GuessLog(),
+        )
+        state.submit_guess("Bob", "5555")
+        state.remove_player("Alice")
+        restored = GameState.from_bytes(state.to_bytes(), columnar=True)
+        assert restored.players == ["Bob"]
+        assert restored.all_guesses.players is restored.players
+        assert restored.all_guesses[0].player == "Bob"
+
+
+class TestColumnarGameState:
+    def make_state(self, all_guesses):
+        config = GameConfig(secret_code="1234", game_type=2, num_of_guesses=3)
+        state = GameState(config, mode=GameMode.MULTI_BOARD, all_guesses=all_guesses)
+        for name in ["Alice", "Bob"]:
+            state.add_player(name)
+        for name, guess in [("Alice", "5555"), ("Bob", "1243"), ("Alice", "1243")]:
+            state.submit_guess(name, guess)
+        return state
+
+    def test_matches_list_storage(self):
+        columnar = self.make_state(GuessLog())
+        plain = self.make_state(None)
+        assert isinstance(plain.all_guesses, list)
+        assert isinstance(columnar.all_guesses, GuessLog)
+        assert len(columnar.all_guesses.code_table) == 2
+
+        def without_timestamps(state):
+            data = state.to_dict()
+            data["guesses"] = [
+                {key: value for key, value in entry.items() if key != "timestamp"}
+                for entry in data["guesses"]
+            ]
+            return data
+
+        assert without_timestamps(columnar) == without_timestamps(plain)
+        assert columnar.guess_count("Alice") == 2
+        assert columnar.remaining_candidates("Bob") == plain.remaining_candidates("Bob")
+
+        for state in (columnar, plain):
+            # recounted from the columns
+            state.all_guesses = state.all_guesses
+            assert state.guess_count("Alice") == 2
+            assert state.game_won is False
+            state.submit_guess("Bob", "1234")
+            state.submit_guess("Alice", "1111")
+            state.submit_guess("Bob", "2222")
+        assert columnar.game_won is True
+        assert columnar.game_over is True
+        assert without_timestamps(columnar) == without_timestamps(plain)
+
+        columnar.reset()
+        assert isinstance(columnar.all_guesses, GuessLog)
+        assert len(columnar.all_guesses) == 0
+
+    def test_snapshots(self):
+        state = self.make_state(GuessLog())
+        state.player_states["Bob"].guesses = GuessLog(state.all_guesses[1:2])
+        state.mark_dirty()
+        data = state.to_bytes()
+        plain = self.make_state(GuessLog())
+        plain.all_guesses = list(state.all_guesses)
+        plain.player_states["Bob"].guesses = list(state.player_states["Bob"].guesses)
+        plain.version = state.version
+        assert GameState.from_bytes(plain.to_bytes()).to_dict() == state.to_dict()
+
+        restored = GameState.from_bytes(data, columnar=True)
+        assert isinstance(restored.all_guesses, GuessLog)
+        assert isinstance(restored.player_states["Bob"].guesses, GuessLog)
+        assert restored.all_guesses == state.all_guesses
+        assert restored.to_dict() == state.to_dict()
+        assert GameState.from_bytes(data).to_dict() == state.to_dict()
+        assert isinstance(GameState.from_bytes(data).all_guesses, list)
+
+        # only guesses added since the last snapshot are packed
+        state.submit_guess("Bob", "6543")
+        assert GameState.from_bytes(state.to_bytes()).to_dict() == state.to_dict()
+
+
+class TestLazyFromDict:
+    def make_data(self, game_type=1):
+        config = GameConfig(secret_code="1234", num_of_guesses=10, game_type=game_type)
+        mode = GameMode.MULTI_BOARD if game_type == 2 else GameMode.SINGLE_BOARD
+        state = GameState(config, mode=mode)
+        state.add_player("Alice")
+        for guess in ["5555", "6666", "1243"]:
+            state.submit_guess("Alice", guess)
+        state.player_states["Alice"].guesses = list(state.all_guesses)
+        state.mark_dirty()
+        return config, state.to_dict()
+
+    def test_status_without_decoding(self):
+        config, data = self.make_data()
+        with patch.object(PlayerGuess, "from_dict") as from_dict:
+            state = GameState.from_dict(data, config, lazy=True)
+            assert state.game_over is False
+            assert state.game_won is False
+            assert state.current_row == 3
+            assert state.remaining_guesses == 7
+            from_dict.assert_not_called()
+
+    def test_multi_board_status_without_decoding(self):
+        config, data = self.make_data(game_type=2)
+        with patch.object(PlayerGuess, "from_dict") as from_dict:
+            state = GameState.from_dict(data, config, lazy=True)
+            assert state.game_over is False
+            assert state.guess_count("Alice") == 3
+            assert len(state.player_states["Alice"].guesses) == 3
+            from_dict.assert_not_called()
+
+    def test_matches_eager_load(self):
+        config, data = self.make_data()
+        lazy = GameState.from_dict(data, config, lazy=True)
+        eager = GameState.from_dict(data, config)
+        assert lazy.to_dict() == eager.to_dict()
+        assert lazy.player_states == eager.player_states
+
+        for state in (lazy, eager):
+            state.submit_guess("Alice", "1234")
+        assert lazy.game_won is True
+        # only the new guesses' timestamps differ
+        lazy_dict, eager_dict = lazy.to_dict(), eager.to_dict()
+        assert lazy_dict.pop("guesses")[:-1] == eager_dict.pop("guesses")[:-1]
+        assert lazy_dict == eager_dict
+        assert [g["guess"] for g in lazy.diff_since(data["version"])["guesses"]] == [
+            "1234"
+        ]
+
+    def test_delta_and_to_dict_without_decoding(self):
+        config, data = self.make_data(game_type=2)
+        state = GameState.from_dict(data, config, lazy=True)
+        with patch.object(
+            PlayerGuess, "from_dict", wraps=PlayerGuess.from_dict
+        ) as from_dict:
+            delta = state.submit_guess("Alice", "1234", delta=True)
+            assert [g["guess"] for g in delta["guesses"]] == ["1234"]
+            assert state.to_dict()["guesses"][:-1] == data["guesses"]
+            from_dict.assert_not_called()
+
+        # decoded entries are serialized from what they hold now
+        state.all_guesses[0].bulls = 3
+        assert state.to_dict()["guesses"][0]["bulls"] == 3
+
+    def test_from_json(self):
+        config, data = self.make_data()
+        state = GameState.from_dict(data, config)
+        lazy = GameState.from_json(state.to_json(), config, lazy=True)
+        assert isinstance(lazy.all_guesses, LazyGuessList)
+        assert lazy.all_guesses[-1].guess == "1243"
@@ -0,0 +1,60 @@
+from bnc.code import Code
+from bnc.symmetry import Symmetry
+
+
+def codes(*values, num_of_colors=6):
+    return [Code.from_digits([int(c) for c in v], num_of_colors) for v in values]
+
+
+class TestSymmetryFromGuesses:
+    def test_empty_history(self):
+        symmetry = Symmetry.from_guesses([], 4, 6)
+        assert symmetry.position_blocks == ((0, 1, 2, 3),)
+        assert symmetry.free_colors == (1, 2, 3, 4, 5, 6)
+
+    def test_after_guesses(self):
+        symmetry = Symmetry.from_guesses(codes("1122", "1313"), 4, 6)
+        assert symmetry.position_blocks == ((0,), (1,), (2,), (3,))
+        symmetry = Symmetry.from_guesses(codes("1122"), 4, 6)
+        assert symmetry.position_blocks == ((0, 1), (2, 3))
+        assert symmetry.free_colors == (3, 4, 5, 6)
+
+
+class TestCanonical:
+    def test_opening(self):
+        symmetry = Symmetry.from_guesses([], 4, 6)
+        assert str(symmetry.canonical(codes("6543")[0])) == "1234"
+        assert str(symmetry.canonical(codes("3553")[0])) == "1122"
+        assert str(symmetry.canonical(codes("5556")[0])) == "1112"
+
+    def test_respects_history(self):
+        symmetry = Symmetry.from_guesses(codes("1122"), 4, 6)
+        assert str(symmetry.canonical(codes("2165")[0])) == "1234"
+        assert str(symmetry.canonical(codes("6611")[0])) == "3311"
+
+
+class TestRepresentatives:
+    def test_opening_counts(self):
+        assert len(Symmetry.from_guesses([], 4, 6).representatives()) == 8
+        assert len(Symmetry.from_guesses([], 6, 10).representatives()) == 32
+
+    def test_covers_every_orbit(self):
+        for history in (
+            [],
+            codes("112", num_of_colors=5),
+            codes("123", "311", num_of_colors=5),
+        ):
+            symmetry = Symmetry.from_guesses(history, 3, 5)
+            representatives = set(symmetry.representatives().tolist())
+            for rank in range(125):
+                canonical = symmetry.canonical(Code.unrank(rank, 3, 5))
+                assert canonical.rank in representatives
+
+    def test_sorted(self):
+        ranks = Symmetry.from_guesses(codes("1122"), 4, 6).representatives()
+        assert ranks.tolist() == sorted(ranks.tolist())
+
+    def test_limit(self):
+        symmetry = Symmetry.from_guesses([], 4, 6)
+        assert symmetry.representatives(limit=7) is None
+        assert len(symmetry.representatives(limit=8)) == 8
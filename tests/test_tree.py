@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from bnc.code import Code
+from bnc.solver import KnuthSolver
+from bnc.tree import DecisionTree, decision_tree_path, load_decision_tree, main
+
+
+@pytest.fixture(scope="module")
+def tree():
+    return DecisionTree.compile(KnuthSolver(4, 6))
+
+
+class TestDecisionTree:
+    def test_knuth_statistics(self, tree):
+        assert tree.worst_case == 5
+        assert tree.total_guesses == 5801
+        assert tree.average_guesses == pytest.approx(4.476, abs=1e-3)
+
+    def test_walk_matches_solver(self, tree):
+        solver = KnuthSolver(4, 6)
+        assert str(tree.next_guess()) == "1122"
+        history = [("1122", 0, 1)]
+        assert tree.next_guess(history) == solver.next_guess(history)
+        history.append((tree.next_guess(history), 1, 0))
+        assert tree.next_guess(history) == solver.next_guess(history)
+
+    def test_every_secret_is_reached(self, tree):
+        solver = KnuthSolver(4, 6)
+        for rank in range(0, 1296, 31):
+            secret = Code.unrank(rank, 4, 6)
+            history = []
+            while (guess := tree.next_guess(history)) != secret:
+                feedback = int(solver.feedback(guess.rank, secret.rank)[0, 0])
+                history.append((guess, *divmod(feedback, 5)))
+            assert len(history) < tree.worst_case
+
+    def test_off_tree(self, tree):
+        assert tree.next_guess([("1234", 0, 0)]) is None
+
+    def test_save_and_load(self, tree, tmp_path):
+        path = tmp_path / "tree.npy"
+        tree.save(path)
+        loaded = DecisionTree.load(path)
+        assert len(loaded) == len(tree)
+        assert loaded.worst_case == tree.worst_case
+        assert loaded.next_guess([("1122", 1, 1)]) == tree.next_guess([("1122", 1, 1)])
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.npy"
+        np.save(path, np.zeros(3))
+        with pytest.raises(ValueError, match="not a decision tree"):
+            DecisionTree.load(path)
+
+
+class TestMain:
+    def test_writes_tree(self, tmp_path, capsys):
+        main(
+            [
+                "--code-length",
+                "3",
+                "--num-of-colors",
+                "5",
+                "--cache-dir",
+                str(tmp_path),
+            ]
+        )
+        assert decision_tree_path("knuth", 3, 5, tmp_path).exists()
+        assert "worst case" in capsys.readouterr().out
+        tree = load_decision_tree("knuth", 3, 5, tmp_path)
+        assert tree.next_guess() == KnuthSolver(3, 5).next_guess()
@@ -1,12 +1,25 @@
+import asyncio
 from unittest.mock import Mock, patch
 
 import httpx
+import numpy as np
 import pytest
 
 from bnc.utils import (
+    CircuitBreaker,
     calculate_bulls_and_cows,
+    calculate_bulls_and_cows_batch,
     check_color,
+    code_space,
+    color_histogram,
+    decode_codes,
+    encode_codes,
+    fetch_random_integers,
+    fetch_random_integers_async,
     generate_guess,
+    generate_secrets,
+    get_circuit_breaker,
+    get_http_client,
     get_random_number,
     validate_code_input,
 )
@@ -101,6 +114,64 @@ class TestCalculateBullsAndCows:
             calculate_bulls_and_cows([], [1, 2, 3, 4])
 
 
+class TestEncodeCodes:
+    def test_round_trip(self):
+        digits = np.array([[1, 1, 1, 1], [1, 2, 3, 4], [6, 6, 6, 6]])
+        codes = encode_codes(digits, 6)
+        assert codes.tolist() == [0, 0 * 216 + 1 * 36 + 2 * 6 + 3, 1295]
+        assert decode_codes(codes, 4, 6).tolist() == digits.tolist()
+
+    def test_code_space_order(self):
+        space = code_space(3, 5)
+        assert space.shape == (125, 3)
+        assert space[0].tolist() == [1, 1, 1]
+        assert space[1].tolist() == [1, 1, 2]
+        assert space[-1].tolist() == [5, 5, 5]
+        assert encode_codes(space, 5).tolist() == list(range(125))
+
+
+class TestColorHistogram:
+    def test_histogram(self):
+        assert color_histogram([1, 1, 3, 6], 6) == [0, 2, 0, 1, 0, 0, 1]
+
+    def test_scoring_with_histogram_matches_counter(self):
+        space = code_space(3, 4).tolist()
+        for secret in space:
+            histogram = color_histogram(secret, 4)
+            for guess in space:
+                assert calculate_bulls_and_cows(
+                    secret, guess, histogram
+                ) == calculate_bulls_and_cows(secret, guess)
+
+
+class TestCalculateBullsAndCowsBatch:
+    def test_matches_scalar_version(self):
+        space = code_space(4, 6)
+        for guess in ([1, 1, 2, 2], [1, 2, 3, 4], [6, 5, 6, 5]):
+            bulls, cows = calculate_bulls_and_cows_batch(space, np.array(guess), 6)
+            for i in range(0, len(space), 97):
+                expected = calculate_bulls_and_cows(space[i].tolist(), guess)
+                assert (bulls[i], cows[i]) == expected
+
+    def test_many_guesses_one_secret(self):
+        guesses = np.array([[1, 2, 3, 4], [4, 3, 2, 1], [1, 3, 2, 5]])
+        bulls, cows = calculate_bulls_and_cows_batch(np.array([1, 2, 3, 4]), guesses)
+        assert bulls.tolist() == [4, 0, 1]
+        assert cows.tolist() == [0, 4, 2]
+
+    def test_duplicates(self):
+        bulls, cows = calculate_bulls_and_cows_batch([1, 1, 2, 3], [1, 2, 1, 1])
+        assert (int(bulls), int(cows)) == (1, 2)
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError, match="lengths differ"):
+            calculate_bulls_and_cows_batch([1, 2, 3, 4], [1, 2, 3])
+
+    def test_empty_secret(self):
+        with pytest.raises(ValueError, match="Secret code must be set"):
+            calculate_bulls_and_cows_batch([], [1, 2, 3, 4])
+
+
 class TestGenerateGuess:
     def test_correct_length(self):
         guess = generate_guess(4, 6)
@@ -129,6 +200,42 @@ class TestGenerateGuess:
         assert mock_randint.call_count == 4
 
 
+class TestGenerateSecrets:
+    def test_digits(self):
+        secrets = generate_secrets(1000, 5, 7, rng=1)
+        assert secrets.shape == (1000, 5)
+        assert secrets.dtype == np.uint8
+        assert secrets.min() == 1
+        assert secrets.max() == 7
+
+    def test_encoded(self):
+        secrets = generate_secrets(1000, 4, 6, rng=1, encoded=True)
+        assert secrets.shape == (1000,)
+        assert secrets.dtype == np.int64
+        assert 0 <= secrets.min() and secrets.max() < 6**4
+        digits = decode_codes(secrets, 4, 6)
+        assert np.array_equal(encode_codes(digits, 6), secrets)
+
+    def test_seeding(self):
+        assert np.array_equal(
+            generate_secrets(50, 4, 6, rng=42), generate_secrets(50, 4, 6, rng=42)
+        )
+        rng = np.random.default_rng(7)
+        first = generate_secrets(50, 4, 6, rng=rng)
+        assert not np.array_equal(first, generate_secrets(50, 4, 6, rng=rng))
+
+    def test_empty(self):
+        assert generate_secrets(0, 4, 6).shape == (0, 4)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="n must be non-negative"):
+            generate_secrets(-1, 4, 6)
+        with pytest.raises(ValueError, match="Length must be a positive integer"):
+            generate_secrets(1, 0, 6)
+        with pytest.raises(ValueError, match="num_of_colors must be at least 1"):
+            generate_secrets(1, 4, 0)
+
+
 class TestGetRandomNumber:
     def test_custom_length(self):
         with patch("bnc.utils.random.randint", side_effect=[1, 2, 3, 4, 5]):
@@ -161,7 +268,7 @@ class TestGetRandomNumber:
         with pytest.raises(ValueError, match="min_value cannot be negative"):
             get_random_number(min_value=-1)
 
-    @patch("bnc.utils.httpx.get")
+    @patch("bnc.utils.httpx.Client.get")
     def test_api_success(self, mock_get):
         mock_response = Mock()
         mock_response.text = "1 2 3 4"
@@ -178,7 +285,7 @@ class TestGetRandomNumber:
         assert kwargs["params"]["min"] == 1
         assert kwargs["params"]["max"] == 6
 
-    @patch("bnc.utils.httpx.get")
+    @patch("bnc.utils.httpx.Client.get")
     def test_api_failure_fallback(self, mock_get):
         mock_get.side_effect = httpx.RequestError("Connection failed")
 
@@ -186,7 +293,7 @@ class TestGetRandomNumber:
             result = get_random_number(length=4)
             assert result == "1234"
 
-    @patch("bnc.utils.httpx.get")
+    @patch("bnc.utils.httpx.Client.get")
     def test_api_http_error_fallback(self, mock_get):
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
@@ -198,7 +305,7 @@ class TestGetRandomNumber:
             result = get_random_number(length=4)
             assert result == "5656"
 
-    @patch("bnc.utils.httpx.get")
+    @patch("bnc.utils.httpx.Client.get")
     def test_api_wrong_response_length(self, mock_get):
         mock_response = Mock()
         mock_response.text = "1 2 3"
@@ -209,7 +316,7 @@ class TestGetRandomNumber:
             result = get_random_number(length=4)
             assert result == "4321"
 
-    @patch("bnc.utils.httpx.get")
+    @patch("bnc.utils.httpx.Client.get")
     @patch("bnc.utils.logger")
     def test_logging_on_api_failure(self, mock_logger, mock_get):
         mock_get.side_effect = httpx.RequestError("Network error")
@@ -220,3 +327,98 @@ class TestGetRandomNumber:
         mock_logger.warning.assert_called_once()
         warning_msg = mock_logger.warning.call_args[0][0]
         assert "Failed to get random number from API" in warning_msg
+
+    @patch("bnc.utils.httpx.Client.get")
+    def test_circuit_opens_after_repeated_failures(self, mock_get):
+        mock_get.side_effect = httpx.ConnectTimeout("timed out")
+
+        for _ in range(5):
+            assert len(get_random_number(length=4)) == 4
+
+        # after three failures the remote is skipped entirely
+        assert mock_get.call_count == 3
+        assert get_circuit_breaker("https://www.random.org/integers/").is_open
+
+    def test_shared_client(self):
+        client = get_http_client()
+        assert get_http_client() is client
+        client.close()
+        assert get_http_client() is not client
+
+
+class TestCircuitBreaker:
+    def make(self):
+        self.now = 0.0
+        return CircuitBreaker(failure_threshold=2, cooldown=10, clock=lambda: self.now)
+
+    def test_opens_after_threshold(self):
+        breaker = self.make()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow()
+
+    def test_success_resets_failures(self):
+        breaker = self.make()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+    def test_half_open_after_cooldown(self):
+        breaker = self.make()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.now = 10.0
+        # a single trial call is let through
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert not breaker.is_open
+        assert breaker.allow()
+
+    def test_failed_trial_reopens(self):
+        breaker = self.make()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.now = 10.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow()
+        self.now = 19.0
+        assert not breaker.allow()
+        self.now = 20.0
+        assert breaker.allow()
+
+    def test_released_trial(self):
+        breaker = self.make()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.now = 10.0
+        assert breaker.allow()
+        breaker.release_trial()
+        assert breaker.is_open
+        assert breaker.allow()
+
+    def test_cancelled_trial_request_is_released(self):
+        url = "https://www.random.org/integers/"
+        breaker = get_circuit_breaker(url)
+        breaker.cooldown = 0.0
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        async def cancelled(*args, **kwargs):
+            raise asyncio.CancelledError
+
+        with patch("bnc.utils.httpx.AsyncClient.get", side_effect=cancelled):
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(fetch_random_integers_async(4, 1, 6, url=url))
+        with patch("bnc.utils.httpx.Client.get", side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                fetch_random_integers(4, 1, 6, url=url)
+        assert breaker.allow()
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError, match="failure_threshold"):
+            CircuitBreaker(failure_threshold=0)